@@ -0,0 +1,270 @@
+import argparse
+import json
+import multiprocessing
+import os
+from collections import Counter
+from telemetry import MAGIC, TelemetryReader, parse_clock
+
+_DAY_MS = 24 * 60 * 60 * 1000
+_LOG_SUFFIXES = ("events", "state", "telemetry")
+
+
+class RunningStats:
+    """Count, mean, min and max of a stream of numbers in constant memory."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def as_dict(self):
+        return {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max}
+
+
+class SessionStats:
+    """Aggregates of one play session, fed one log record at a time.
+
+    Events and state snapshots may arrive from separate files (the logger's
+    game_events.jsonl / game_state.jsonl) or from one telemetry file; each
+    kind must arrive in the order it was logged.
+
+    A split chain is a run of `asteroid_split` events, each within
+    `chain_gap` seconds of the previous one; an isolated split is a chain
+    of length 1.
+    """
+
+    def __init__(self, name, chain_gap=1.0):
+        self.name = name
+        self.chain_gap = chain_gap
+        self.first = None  # Session clock (s) of the first and last record
+        self.last = None
+        self.event_counts = Counter()
+        self.chains = RunningStats()
+        self.hit_intervals = RunningStats()
+        self.asteroids = RunningStats()
+        self.asteroids_by_minute = {}  # minute -> [sum of counts, snapshots]
+        self.snapshots = 0
+        self._chain_length = 0
+        self._last_split = None
+        self._last_hit = None
+        self._state_start = None
+        self._clocks = {}  # kind -> (last raw clock ms, midnight wraps)
+
+    def _seconds(self, kind, timestamp):
+        """Record time in seconds, counting on past midnight if the clock wraps."""
+        clock = parse_clock(timestamp)
+        previous, wraps = self._clocks.get(kind, (clock, 0))
+        if clock < previous - _DAY_MS // 2:
+            wraps += 1
+        self._clocks[kind] = (clock, wraps)
+        seconds = (clock + wraps * _DAY_MS) / 1000
+        self.first = seconds if self.first is None else min(self.first, seconds)
+        self.last = seconds if self.last is None else max(self.last, seconds)
+        return seconds
+
+    def add(self, record):
+        if "type" in record:
+            self.add_event(record)
+        else:
+            self.add_state(record)
+
+    def add_event(self, event):
+        now = self._seconds("event", event["timestamp"])
+        event_type = event["type"]
+        self.event_counts[event_type] += 1
+        if event_type == "asteroid_split":
+            if self._last_split is not None and now - self._last_split > self.chain_gap:
+                self._end_chain()
+            self._chain_length += 1
+            self._last_split = now
+        elif event_type == "player_hit":
+            if self._last_hit is not None:
+                self.hit_intervals.add(now - self._last_hit)
+            self._last_hit = now
+
+    def _end_chain(self):
+        if self._chain_length:
+            self.chains.add(self._chain_length)
+        self._chain_length = 0
+
+    def add_state(self, entry):
+        now = self._seconds("state", entry["timestamp"])
+        self.snapshots += 1
+        asteroids = entry.get("asteroids")
+        if asteroids is None:
+            return
+        if self._state_start is None:
+            self._state_start = now
+        count = asteroids["count"]
+        self.asteroids.add(count)
+        bucket = self.asteroids_by_minute.setdefault(int((now - self._state_start) // 60), [0, 0])
+        bucket[0] += count
+        bucket[1] += 1
+
+    def finish(self):
+        """Close the split chain still open at the end of the log."""
+        self._end_chain()
+        self._last_split = None
+        return self
+
+    def merge(self, other):
+        """Fold in another partial of the same session (or another session)."""
+        for value in (other.first, other.last):
+            if value is not None:
+                self.first = value if self.first is None else min(self.first, value)
+                self.last = value if self.last is None else max(self.last, value)
+        self.event_counts.update(other.event_counts)
+        self.chains.merge(other.chains)
+        self.hit_intervals.merge(other.hit_intervals)
+        self.asteroids.merge(other.asteroids)
+        self.snapshots += other.snapshots
+        for minute, (total, count) in other.asteroids_by_minute.items():
+            bucket = self.asteroids_by_minute.setdefault(minute, [0, 0])
+            bucket[0] += total
+            bucket[1] += count
+
+    @property
+    def duration(self):
+        return self.last - self.first if self.first is not None else 0.0
+
+    def per_minute(self, event_type, duration=None):
+        duration = self.duration if duration is None else duration
+        return self.event_counts[event_type] * 60 / duration if duration > 0 else None
+
+    def as_dict(self, duration=None):
+        duration = self.duration if duration is None else duration
+        return {
+            "session": self.name,
+            "duration_s": duration,
+            "events": dict(self.event_counts),
+            # Asteroids hit by a shot; shots that miss aren't logged
+            "hits_per_minute": self.per_minute("asteroid_shot", duration),
+            "split_chains": self.chains.as_dict(),
+            "time_between_hits_s": self.hit_intervals.as_dict(),
+            "asteroid_count": self.asteroids.as_dict(),
+            "asteroid_count_by_minute": {
+                minute: total / count for minute, (total, count) in sorted(self.asteroids_by_minute.items())
+            },
+        }
+
+
+def read_records(path):
+    """Yield the records of a JSONL log or a telemetry file, one at a time."""
+    with open(path, "rb") as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+    if binary:
+        with TelemetryReader(path) as reader:
+            yield from reader.states()
+            yield from reader.events()
+        return
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def session_name(path):
+    """Logs of one session share a name: "runs/a/game_events.jsonl" -> "runs/a/game"."""
+    stem = os.path.splitext(path)[0]
+    for suffix in _LOG_SUFFIXES:
+        if stem.endswith(suffix):
+            return stem[:-len(suffix)].rstrip("_-.") or stem
+    return stem
+
+
+def analyze_file(job):
+    path, chain_gap = job
+    stats = SessionStats(session_name(path), chain_gap)
+    for record in read_records(path):
+        stats.add(record)
+    return stats.finish()
+
+
+def analyze(paths, chain_gap=1.0, processes=None):
+    """Stream every file (in parallel) and return per-session stats by name."""
+    jobs = [(path, chain_gap) for path in paths]
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    if processes > 1:
+        with multiprocessing.Pool(processes) as pool:
+            partials = list(pool.imap_unordered(analyze_file, jobs))
+    else:
+        partials = [analyze_file(job) for job in jobs]
+
+    sessions = {}
+    for partial in partials:
+        if partial.name in sessions:
+            sessions[partial.name].merge(partial)
+        else:
+            sessions[partial.name] = partial
+    return dict(sorted(sessions.items()))
+
+
+def combine(sessions):
+    """Cross-session totals; rates use the summed duration of all sessions."""
+    total = SessionStats("all sessions")
+    for stats in sessions.values():
+        total.merge(stats)
+    return total.as_dict(sum(stats.duration for stats in sessions.values()))
+
+
+def _fmt(value, spec):
+    if value is None:
+        return "-".rjust(int(spec.split(".")[0].rstrip("d")))
+    return format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pacing statistics from game event/state logs (JSONL or binary telemetry)."
+    )
+    parser.add_argument("logs", nargs="+",
+                        help="game_events.jsonl, game_state.jsonl or telemetry files; "
+                             "files named <session>_events/_state/_telemetry are combined")
+    parser.add_argument("--chain-gap", type=float, default=1.0,
+                        help="Longest pause (s) between splits of one chain")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", help="Also write the full results as JSON")
+    args = parser.parse_args()
+
+    sessions = analyze(args.logs, args.chain_gap, args.processes)
+    rows = [stats.as_dict() for stats in sessions.values()]
+    overall = combine(sessions)
+
+    print(f"{'min':>6} {'ast hit/m':>9} {'splits':>7} {'chains':>7} {'avg':>5} {'max':>4} "
+          f"{'hits':>5} {'hit gap s':>9} {'ast avg':>8} {'ast max':>8}  session")
+    for row in rows + [overall]:
+        chains = row["split_chains"]
+        asteroids = row["asteroid_count"]
+        print(f"{row['duration_s'] / 60:6.1f} {_fmt(row['hits_per_minute'], '9.1f')} "
+              f"{row['events'].get('asteroid_split', 0):7d} {chains['count']:7d} "
+              f"{_fmt(chains['mean'], '5.2f')} {_fmt(chains['max'], '4d')} "
+              f"{row['events'].get('player_hit', 0):5d} {_fmt(row['time_between_hits_s']['mean'], '9.1f')} "
+              f"{_fmt(asteroids['mean'], '8.1f')} {_fmt(asteroids['max'], '8d')}  {row['session']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"sessions": rows, "overall": overall}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
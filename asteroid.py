@@ -1,58 +1,86 @@
-from circleshape import CircleShape
+from entitystore import StoredCircleShape
 from constants import (
-    LINE_WIDTH, ASTEROID_MIN_RADIUS, ASTEROID_SPLIT_SPEED,
-    ASTEROID_VERTICES, ASTEROID_JAGGEDNESS, ASTEROID_ROTATION_SPEED
+    ASTEROID_MIN_RADIUS, ASTEROID_SPLIT_SPEED, ASTEROID_ROTATION_SPEED
 )
 from logger import log_event
-import random
-import math
-import pygame
+from asteroidshapes import shape_library
+from randomness import random_service
 
 
-class Asteroid(CircleShape):
+def roll_traits(radius):
+    """Starting rotation, spin and outline for a new asteroid of `radius`."""
+    rng = random_service.gameplay
+    return (
+        rng.uniform(0, 360),
+        rng.uniform(-ASTEROID_ROTATION_SPEED, ASTEROID_ROTATION_SPEED),
+        shape_library.pick(radius),
+    )
+
+
+class Asteroid(StoredCircleShape):
+    planned_traits = None  # Traits for the asteroid being built by create_planned
+
     def __init__(self, x, y, radius):
         super().__init__(x, y, radius)
-        self.rotation = random.uniform(0, 360)
-        self.rotation_speed = random.uniform(-ASTEROID_ROTATION_SPEED, ASTEROID_ROTATION_SPEED)
-        self.shape = self._generate_shape()
-
-    def _generate_shape(self):
-        """Generate random lumpy asteroid vertices as offsets from center."""
-        vertices = []
-        for i in range(ASTEROID_VERTICES):
-            angle = (2 * math.pi / ASTEROID_VERTICES) * i
-            # Randomize radius for each vertex
-            offset = random.uniform(1 - ASTEROID_JAGGEDNESS, 1 + ASTEROID_JAGGEDNESS)
-            vertices.append((angle, self.radius * offset))
-        return vertices
+        self._randomize()
+
+    def reset(self, x, y, radius):
+        super().reset(x, y, radius)
+        self._randomize()
+
+    def _randomize(self):
+        traits = self.planned_traits or roll_traits(self.radius)
+        self.rotation, self.rotation_speed, self.shape = traits
+
+    @classmethod
+    def create_planned(cls, x, y, radius, traits):
+        """Like `create`, with traits rolled in advance by `roll_traits`."""
+        cls.planned_traits = traits
+        try:
+            return cls.create(x, y, radius)
+        finally:
+            cls.planned_traits = None
+
+    @property
+    def rotation(self):
+        return float(self.entity_store.rotations[self.slot])
+
+    @rotation.setter
+    def rotation(self, value):
+        store, slot = self.entity_store, self.slot
+        store.rotations[slot] = value
+        store.previous_rotations[slot] = value
+        store.render_rotations[slot] = value
+
+    @property
+    def rotation_speed(self):
+        return float(self.entity_store.rotation_speeds[self.slot])
+
+    @rotation_speed.setter
+    def rotation_speed(self, value):
+        self.entity_store.rotation_speeds[self.slot] = value
 
     def _get_polygon_points(self):
         """Get current polygon points based on position and rotation."""
-        points = []
-        for angle, dist in self.shape:
-            rotated_angle = angle + math.radians(self.rotation)
-            x = self.position.x + math.cos(rotated_angle) * dist
-            y = self.position.y + math.sin(rotated_angle) * dist
-            points.append((x, y))
-        return points
-
-    def draw(self, screen):
-        points = self._get_polygon_points()
-        pygame.draw.polygon(screen, "white", points, width=LINE_WIDTH)
-
-    def update(self, dt):
-        self.position += self.velocity * dt
-        self.rotation += self.rotation_speed * dt
-        self.wrap_position()
+        return self.shape.points(self.position.x, self.position.y, self.rotation)
+
+    def draw(self, screen, alpha=1.0):
+        store, slot = self.entity_store, self.slot
+        x, y = store.render_positions[slot].tolist()
+        frame = self.shape.frame(store.render_rotations.item(slot))
+        half = self.shape.half_size
+        return screen.blit(frame, (x - half, y - half))
 
     def split(self):
         self.kill()
         if self.radius <= ASTEROID_MIN_RADIUS:
             return
         log_event("asteroid_split")
-        angle = random.uniform(20, 50)
-        angle1 = self.velocity.rotate(angle)
-        angle2 = self.velocity.rotate(-angle)
+        angle = random_service.gameplay.uniform(20, 50)
+        velocity = self.velocity
+        angle1 = velocity.rotate(angle)
+        angle2 = velocity.rotate(-angle)
         new_radius = self.radius - ASTEROID_MIN_RADIUS
-        Asteroid(self.position.x, self.position.y, new_radius).velocity = angle1 * ASTEROID_SPLIT_SPEED
-        Asteroid(self.position.x, self.position.y, new_radius).velocity = angle2 * ASTEROID_SPLIT_SPEED
\ No newline at end of file
+        x, y = self.position
+        Asteroid.create(x, y, new_radius).velocity = angle1 * ASTEROID_SPLIT_SPEED
+        Asteroid.create(x, y, new_radius).velocity = angle2 * ASTEROID_SPLIT_SPEED
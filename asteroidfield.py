@@ -1,14 +1,26 @@
+from collections import deque
+from itertools import islice
 import pygame
-import random
-from asteroid import Asteroid
+from asteroid import Asteroid, roll_traits
+from randomness import random_service
 from constants import (
     SCREEN_WIDTH, SCREEN_HEIGHT, ASTEROID_MAX_RADIUS, ASTEROID_MIN_RADIUS,
     ASTEROID_KINDS, WAVE_BASE_ASTEROIDS, WAVE_ASTEROIDS_INCREMENT,
-    WAVE_SPEED_MULTIPLIER
+    WAVE_SPEED_MULTIPLIER, WAVE_PLAN_BUDGET, WAVE_SPAWN_BUDGET
 )
 
 
 class AsteroidField(pygame.sprite.Sprite):
+    """Spawns waves, spreading the work over several steps.
+
+    `prepare_wave` starts rolling the next wave (spawn points, velocities,
+    spin and outline), a few asteroids per `update`, during the pause
+    between waves. `spawn_wave` finishes any of that still left and
+    releases the asteroids WAVE_SPAWN_BUDGET per step. The gameplay stream
+    is drawn in the same order as creating the whole wave at once, so a
+    seed still gives the same waves.
+    """
+
     edges = [
         [
             pygame.Vector2(1, 0),
@@ -34,24 +46,67 @@ class AsteroidField(pygame.sprite.Sprite):
 
     def __init__(self):
         pygame.sprite.Sprite.__init__(self, self.containers)
+        self.planned_wave = None
+        self.planning = None  # Generator rolling the rest of planned_wave
+        self.planned = []
+        self.releasing = deque()
+
+    @property
+    def spawning(self):
+        """True while a started wave still has asteroids to release."""
+        return bool(self.releasing)
 
     def spawn(self, radius, position, velocity):
-        asteroid = Asteroid(position.x, position.y, radius)
+        asteroid = Asteroid.create(position.x, position.y, radius)
         asteroid.velocity = velocity
 
-    def spawn_wave(self, wave_number):
+    def _plan(self, wave_number):
+        """Yield (radius, position, velocity, traits) for each asteroid of the wave."""
         asteroid_count = WAVE_BASE_ASTEROIDS + (wave_number - 1) * WAVE_ASTEROIDS_INCREMENT
         speed_multiplier = WAVE_SPEED_MULTIPLIER ** (wave_number - 1)
 
+        rng = random_service.gameplay
+        warm_frames = pygame.display.get_surface() is not None
         for _ in range(asteroid_count):
-            edge = random.choice(self.edges)
-            base_speed = random.randint(40, 100)
+            edge = rng.choice(self.edges)
+            base_speed = rng.randint(40, 100)
             speed = base_speed * speed_multiplier
             velocity = edge[0] * speed
-            velocity = velocity.rotate(random.randint(-30, 30))
-            position = edge[1](random.uniform(0, 1))
-            kind = random.randint(1, ASTEROID_KINDS)
-            self.spawn(ASTEROID_MIN_RADIUS * kind, position, velocity)
+            velocity = velocity.rotate(rng.randint(-30, 30))
+            position = edge[1](rng.uniform(0, 1))
+            kind = rng.randint(1, ASTEROID_KINDS)
+            radius = ASTEROID_MIN_RADIUS * kind
+            traits = roll_traits(radius)
+            if warm_frames:
+                # Rasterize the first frame now rather than on the spawn frame
+                rotation, _, shape = traits
+                shape.frame(rotation)
+            yield radius, position, velocity, traits
+
+    def prepare_wave(self, wave_number):
+        """Start precomputing `wave_number`; `update` advances it."""
+        self.planned_wave = wave_number
+        self.planning = self._plan(wave_number)
+        self.planned = []
+
+    def spawn_wave(self, wave_number):
+        if self.planned_wave != wave_number:
+            self.prepare_wave(wave_number)
+        self.planned.extend(self.planning)
+        self.releasing.extend(self.planned)
+        self.planned_wave = None
+        self.planning = None
+        self.planned = []
+        self.release(WAVE_SPAWN_BUDGET)
+
+    def release(self, budget):
+        for _ in range(min(budget, len(self.releasing))):
+            radius, position, velocity, traits = self.releasing.popleft()
+            asteroid = Asteroid.create_planned(position.x, position.y, radius, traits)
+            asteroid.velocity = velocity
 
     def update(self, dt):
-        pass
\ No newline at end of file
+        if self.planning is not None:
+            self.planned.extend(islice(self.planning, WAVE_PLAN_BUDGET))
+        if self.releasing:
+            self.release(WAVE_SPAWN_BUDGET)
\ No newline at end of file
@@ -0,0 +1,159 @@
+import math
+from collections import OrderedDict
+import pygame
+from constants import (
+    LINE_WIDTH, ASTEROID_VERTICES, ASTEROID_JAGGEDNESS,
+    ASTEROID_ROTATION_STEPS, ASTEROID_SHAPE_VARIANTS, ASTEROID_FRAME_CACHE_BYTES
+)
+from randomness import random_service
+
+
+def generate_outline(radius):
+    """Generate random lumpy asteroid vertices as (angle, distance) pairs."""
+    vertices = []
+    for i in range(ASTEROID_VERTICES):
+        angle = (2 * math.pi / ASTEROID_VERTICES) * i
+        # Randomize radius for each vertex
+        offset = random_service.cosmetic.uniform(1 - ASTEROID_JAGGEDNESS, 1 + ASTEROID_JAGGEDNESS)
+        vertices.append((angle, radius * offset))
+    return vertices
+
+
+class FrameCache:
+    """Bounds the memory held by rasterized rotation frames, least recently used first.
+
+    A full set of frames for one radius 60 outline is about 7 MB of 32-bit
+    pixels, so every step of every shape would reach tens of MB. Once the
+    frames tracked here pass `max_bytes`, the ones blitted longest ago are
+    dropped and rasterized again if they come back into use. Display-format
+    surfaces are kept (8-bit ones blit several times slower).
+    """
+
+    def __init__(self, max_bytes=ASTEROID_FRAME_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (shape, step) -> bytes
+        self.bytes = 0
+        self.rendered = 0
+        self.evicted = 0
+
+    def touch(self, shape, step):
+        self.entries.move_to_end((shape, step))
+
+    def add(self, shape, step, surface):
+        size = surface.get_pitch() * surface.get_height()
+        self.entries[(shape, step)] = size
+        self.bytes += size
+        self.rendered += 1
+        entries = self.entries
+        while self.bytes > self.max_bytes and len(entries) > 1:
+            (old_shape, old_step), old_size = entries.popitem(last=False)
+            old_shape.frames[old_step] = None
+            self.bytes -= old_size
+            self.evicted += 1
+
+    def clear(self):
+        for shape, step in self.entries:
+            shape.frames[step] = None
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {
+            "frames": len(self.entries),
+            "bytes": self.bytes,
+            "rendered": self.rendered,
+            "evicted": self.evicted,
+        }
+
+
+class AsteroidShape:
+    """A shared asteroid outline, rasterized once per rotation step.
+
+    Frames are rendered the first time each step is needed and reused by
+    every asteroid drawn with this shape, until `cache` evicts them. While
+    `simplified` is set (World.bind copies it from the world, where the
+    quality governor lowers it) every rotation shares one plain circle
+    outline, so no new frames get rasterized.
+    """
+
+    simplified = False
+
+    def __init__(self, radius, vertices, cache=None):
+        self.radius = radius
+        self.vertices = vertices
+        self.cache = cache
+        extent = max(dist for _, dist in vertices)
+        self.half_size = math.ceil(extent) + LINE_WIDTH
+        self.frames = [None] * ASTEROID_ROTATION_STEPS
+        self.simple_frame = None
+
+    def points(self, x, y, rotation):
+        """Polygon points for this outline at the given position and rotation."""
+        rad = math.radians(rotation)
+        return [
+            (x + math.cos(angle + rad) * dist, y + math.sin(angle + rad) * dist)
+            for angle, dist in self.vertices
+        ]
+
+    def frame(self, rotation):
+        if AsteroidShape.simplified:
+            if self.simple_frame is None:
+                self.simple_frame = self._render_simple()
+            return self.simple_frame
+        step = round(rotation * ASTEROID_ROTATION_STEPS / 360) % ASTEROID_ROTATION_STEPS
+        surface = self.frames[step]
+        cache = self.cache
+        if surface is None:
+            surface = self._render(step * 360 / ASTEROID_ROTATION_STEPS)
+            self.frames[step] = surface
+            if cache is not None:
+                cache.add(self, step, surface)
+        elif cache is not None:
+            cache.touch(self, step)
+        return surface
+
+    def _blank(self):
+        size = self.half_size * 2
+        surface = pygame.Surface((size, size))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill((0, 0, 0))
+        return surface
+
+    def _render(self, rotation):
+        surface = self._blank()
+        points = self.points(self.half_size, self.half_size, rotation)
+        pygame.draw.polygon(surface, "white", points, width=LINE_WIDTH)
+        surface.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        return surface
+
+    def _render_simple(self):
+        surface = self._blank()
+        pygame.draw.circle(surface, "white", (self.half_size, self.half_size), self.radius, width=LINE_WIDTH)
+        surface.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        return surface
+
+
+class ShapeLibrary:
+    """Bounded set of outlines per radius class, shared flyweight-style."""
+
+    def __init__(self, variants=ASTEROID_SHAPE_VARIANTS, cache_bytes=ASTEROID_FRAME_CACHE_BYTES):
+        self.variants = variants
+        self.shapes = {}
+        self.frame_cache = FrameCache(cache_bytes)
+
+    def pick(self, radius):
+        shapes = self.shapes.setdefault(radius, [])
+        if len(shapes) < self.variants:
+            shape = AsteroidShape(radius, generate_outline(radius), self.frame_cache)
+            shapes.append(shape)
+            return shape
+        return shapes[random_service.cosmetic.randrange(len(shapes))]
+
+    def clear(self):
+        self.frame_cache.clear()
+        self.shapes.clear()
+
+
+# Global shape library shared by every asteroid
+shape_library = ShapeLibrary()
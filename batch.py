@@ -0,0 +1,242 @@
+import argparse
+import ast
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+import constants
+from headless import init_headless, PILOTS
+from world import World
+
+_GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+_bound = None  # Cached import_bound_constants()
+
+
+def _game_modules():
+    """Loaded modules of this game, which hold their own copies of constants."""
+    modules = []
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.dirname(os.path.abspath(path)) == _GAME_DIR:
+            modules.append(module)
+    return modules
+
+
+def _names(node):
+    """Names an expression reads when it is evaluated (lambda bodies run later)."""
+    if isinstance(node, ast.Lambda):
+        return set()
+    if isinstance(node, ast.Name):
+        return {node.id}
+    names = set()
+    for child in ast.iter_child_nodes(node):
+        names |= _names(child)
+    return names
+
+
+def import_bound_constants():
+    """Constants whose value is copied when a module is imported.
+
+    Default arguments, class attributes, module-level values and the
+    definitions of other constants (ASTEROID_MAX_RADIUS from
+    ASTEROID_MIN_RADIUS, say) all take their copy at import, so patching
+    the module globals afterwards would silently not reach them. Found by
+    reading the game's sources, so new uses are picked up by themselves.
+    """
+    global _bound
+    if _bound is not None:
+        return _bound
+    known = {name for name in vars(constants) if name.isupper()}
+    bound = set()
+    for filename in sorted(os.listdir(_GAME_DIR)):
+        if not filename.endswith(".py"):
+            continue
+        with open(os.path.join(_GAME_DIR, filename)) as f:
+            tree = ast.parse(f.read())
+        if filename == "constants.py":
+            # Constants other constants are computed from; the derived
+            # ones themselves are fine to override
+            for node in tree.body:
+                if isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+                    bound |= _names(node.value)
+            continue
+        for node in tree.body:
+            if isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+                bound |= _names(node.value)
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+                    bound |= _names(default)
+            elif isinstance(node, ast.ClassDef):
+                for statement in node.body:
+                    if isinstance(statement, (ast.Assign, ast.AnnAssign)) and statement.value is not None:
+                        bound |= _names(statement.value)
+    _bound = frozenset(bound & known)
+    return _bound
+
+
+def check_override(name):
+    """Raise ValueError unless `name` is a constant that can be overridden per game."""
+    if not hasattr(constants, name):
+        raise ValueError(f"unknown constant {name!r}")
+    if name in import_bound_constants():
+        raise ValueError(f"{name} is fixed when the game modules are imported "
+                         "(default argument, class attribute or source of another constant) "
+                         "and cannot be overridden")
+
+
+def apply_overrides(overrides):
+    """Set constants everywhere they were imported; return a dict to undo it.
+
+    Modules use `from constants import ...`, so patching constants.py alone
+    would not reach them. Only objects built after this call see the new
+    values, so apply overrides before creating the World.
+    """
+    undo = {}
+    modules = _game_modules()
+    for name in overrides:
+        check_override(name)
+    for name, value in overrides.items():
+        for module in modules:
+            if hasattr(module, name):
+                undo[(module, name)] = getattr(module, name)
+                setattr(module, name, value)
+    return undo
+
+
+def restore_overrides(undo):
+    for (module, name), value in undo.items():
+        setattr(module, name, value)
+
+
+def _init_worker():
+    init_headless()
+
+
+def run_game(job):
+    """Play one game to game over (or `max_steps`) and return its metrics."""
+    undo = apply_overrides(job["overrides"])
+    try:
+        # Built under the overrides, so construction-time values (such as
+        # the SHOT_MAX_LIVE shot pool) follow them; costs well under 1 ms
+        world = World()
+        pilot = PILOTS[job["pilot"]]
+        dt = job["dt"]
+        world.reset(job["seed"])
+        steps = 0
+        clock = time.perf_counter
+        start = clock()
+        while steps < job["max_steps"] and not world.game_over:
+            world.step(dt, pilot(world))
+            steps += 1
+        elapsed = clock() - start
+        result = {
+            "config": job["config"],
+            "seed": job["seed"],
+            "wave": world.wave,
+            "score": world.score,
+            "time_alive": steps * dt,
+            "game_over": world.game_over,
+            "step_ms": elapsed / steps * 1000 if steps else 0.0,
+        }
+        world.clear()
+        return result
+    finally:
+        restore_overrides(undo)
+
+
+def make_jobs(configs, runs, pilot, max_steps, dt=1 / 60, seed=0):
+    """Every config is played with the same `runs` seeds, so configs differ only by their overrides."""
+    return [
+        {"config": index, "overrides": overrides, "seed": seed + run, "pilot": pilot,
+         "max_steps": max_steps, "dt": dt}
+        for index, overrides in enumerate(configs)
+        for run in range(runs)
+    ]
+
+
+def run_batch(jobs, processes=None):
+    """Fan the jobs out over a process pool; results arrive in completion order."""
+    processes = processes or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (processes * 8))
+    pool = multiprocessing.Pool(processes, initializer=_init_worker)
+    try:
+        return list(pool.imap_unordered(run_game, jobs, chunksize))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def summarize(configs, results):
+    rows = []
+    for index, overrides in enumerate(configs):
+        runs = [result for result in results if result["config"] == index]
+        if not runs:
+            continue
+        count = len(runs)
+        rows.append({
+            "overrides": overrides,
+            "runs": count,
+            "wave_mean": sum(run["wave"] for run in runs) / count,
+            "wave_max": max(run["wave"] for run in runs),
+            "score_mean": sum(run["score"] for run in runs) / count,
+            "time_alive_mean": sum(run["time_alive"] for run in runs) / count,
+            "game_over_rate": sum(run["game_over"] for run in runs) / count,
+            "step_ms_mean": sum(run["step_ms"] for run in runs) / count,
+        })
+    return rows
+
+
+def _parse_override(text):
+    name, _, value = text.partition("=")
+    if not value:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    return name, ast.literal_eval(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless games in parallel to compare tuning.")
+    parser.add_argument("--runs", type=int, default=100, help="Games per configuration")
+    parser.add_argument("--steps", type=int, default=36000, help="Step limit per game (default: 10 minutes)")
+    parser.add_argument("--pilot", choices=sorted(PILOTS), default="hunter")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game of every configuration")
+    parser.add_argument("--set", dest="overrides", action="append", type=_parse_override, default=[],
+                        metavar="NAME=VALUE",
+                        help="Override a constant; repeat a name to sweep several values")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", help="Also write every run and the summary as JSON")
+    args = parser.parse_args()
+
+    # Cartesian product of every value given per constant
+    values = {}
+    for name, value in args.overrides:
+        try:
+            check_override(name)
+        except ValueError as error:
+            parser.error(str(error))
+        values.setdefault(name, []).append(value)
+    configs = [dict(zip(values, combo)) for combo in itertools.product(*values.values())]
+
+    jobs = make_jobs(configs, args.runs, args.pilot, args.steps, seed=args.seed)
+    start = time.perf_counter()
+    results = run_batch(jobs, args.processes)
+    elapsed = time.perf_counter() - start
+    print(f"{len(results)} games in {elapsed:.1f}s")
+
+    summary = summarize(configs, results)
+    print(f"{'wave':>6} {'max':>4} {'score':>9} {'alive s':>8} {'over':>5} {'step ms':>8}  overrides")
+    for row in summary:
+        overrides = ", ".join(f"{name}={value!r}" for name, value in row["overrides"].items()) or "(defaults)"
+        print(f"{row['wave_mean']:6.2f} {row['wave_max']:4d} {row['score_mean']:9.0f} "
+              f"{row['time_alive_mean']:8.1f} {row['game_over_rate']:5.0%} {row['step_ms_mean']:8.3f}  {overrides}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"summary": summary, "runs": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import argparse
+import json
+import math
+import platform
+import resource
+import time
+import tracemalloc
+from datetime import datetime
+import pygame
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, HUD_FONT_SIZE, SHOT_RADIUS, PLAYER_SHOOT_SPEED
+from headless import init_headless, spinner_pilot
+from hud import draw_hud
+from randomness import random_service
+from shot import Shot
+from world import World
+
+PHASES = ("update", "collision", "draw", "flip")
+
+
+def _start_wave(world, wave):
+    """Replace the opening wave with wave `wave`."""
+    for asteroid in world.asteroids:
+        asteroid.kill()
+    world.wave = wave
+    world.asteroidfield.spawn_wave(wave)
+
+
+def setup_wave_1(world):
+    pass
+
+
+def setup_wave_30(world):
+    _start_wave(world, 30)
+
+
+def setup_stress(world):
+    world.player.invulnerable_timer = math.inf
+    while len(world.asteroids) < 5000:
+        world.asteroidfield.spawn_wave(1)
+    rng = random_service.gameplay
+    for _ in range(500):
+        shot = Shot(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), SHOT_RADIUS)
+        shot.velocity = pygame.Vector2(0, PLAYER_SHOOT_SPEED).rotate(rng.uniform(0, 360))
+        shot.lifetime = math.inf
+
+
+def setup_explosion_storm(world):
+    world.player.invulnerable_timer = math.inf
+
+
+def storm_frame(world):
+    rng = random_service.cosmetic
+    for _ in range(40):
+        world.particles.spawn_explosion(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+
+
+# name: (description, setup, per-frame hook)
+SCENARIOS = {
+    "wave_1": ("Opening wave, spinning and firing", setup_wave_1, None),
+    "wave_30": ("Wave 30 with compounded WAVE_SPEED_MULTIPLIER", setup_wave_30, None),
+    "stress_5k": ("5000 asteroids and 500 live shots", setup_stress, None),
+    "explosion_storm": ("40 explosions per frame on an invulnerable player", setup_explosion_storm, storm_frame),
+}
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(name, screen, font, frames=600, dt=1 / 60, seed=0, trace_memory=False):
+    """Run one scenario and return its timing summary."""
+    description, setup, per_frame = SCENARIOS[name]
+    if trace_memory:
+        tracemalloc.start()
+
+    world = World()
+    world.reset(seed)
+    setup(world)
+
+    timings = {phase: [] for phase in PHASES}
+    frame_times = []
+    clock = time.perf_counter
+    for _ in range(frames):
+        if per_frame:
+            per_frame(world)
+        if world.game_over:
+            world.reset(seed)
+            setup(world)
+
+        t0 = clock()
+        world.update(dt, spinner_pilot(world))
+        t1 = clock()
+        world.resolve_collisions()
+        if not world.game_over:
+            world.advance_waves(dt)
+        t2 = clock()
+        screen.fill("black")
+        world.draw(screen)
+        draw_hud(screen, font, world.score, world.lives, world.wave)
+        t3 = clock()
+        pygame.display.flip()
+        t4 = clock()
+
+        timings["update"].append(t1 - t0)
+        timings["collision"].append(t2 - t1)
+        timings["draw"].append(t3 - t2)
+        timings["flip"].append(t4 - t3)
+        frame_times.append(t4 - t0)
+
+    peak_traced = None
+    if trace_memory:
+        peak_traced = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    total = sum(frame_times)
+    ordered = sorted(frame_times)
+    result = {
+        "description": description,
+        "frames": frames,
+        "fps": frames / total if total > 0 else float("inf"),
+        "frame_ms": {
+            "mean": total / frames * 1000,
+            "p50": _percentile(ordered, 0.50) * 1000,
+            "p99": _percentile(ordered, 0.99) * 1000,
+            "max": ordered[-1] * 1000,
+        },
+        "phase_ms": {phase: sum(values) / frames * 1000 for phase, values in timings.items()},
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "peak_traced_kb": peak_traced // 1024 if peak_traced is not None else None,
+        "end_state": {
+            "wave": world.wave,
+            "score": world.score,
+            "asteroids": len(world.asteroids),
+            "shots": len(world.shots),
+            "particles": world.particles.count,
+        },
+        "pools": world.pool_stats(),
+    }
+    world.clear()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game loop on named scenarios.")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also record tracemalloc peaks (slows the timed frames)")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+
+    init_headless()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    font = pygame.font.Font(None, HUD_FONT_SIZE)
+
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "scenarios": {},
+    }
+    for name in names:
+        result = run_scenario(name, screen, font, args.frames, seed=args.seed, trace_memory=args.trace_memory)
+        results["scenarios"][name] = result
+        phases = "  ".join(f"{phase} {ms:.2f}" for phase, ms in result["phase_ms"].items())
+        print(f"{name:<16} {result['fps']:8.1f} fps  p50 {result['frame_ms']['p50']:.2f}ms  "
+              f"p99 {result['frame_ms']['p99']:.2f}ms  | {phases}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,10 +26,15 @@ ASTEROID_SPLIT_SPEED = 1.2
 ASTEROID_VERTICES = 10           # Number of vertices in asteroid shape
 ASTEROID_JAGGEDNESS = 0.4        # How lumpy (0 = circle, 1 = very jagged)
 ASTEROID_ROTATION_SPEED = 40     # Degrees per second
+ASTEROID_ROTATION_STEPS = 64     # Pre-rendered rotation frames per shape
+ASTEROID_SHAPE_VARIANTS = 4      # Distinct outlines shared per radius
+ASTEROID_FRAME_CACHE_BYTES = 16 * 1024 * 1024  # Rasterized frames kept before the least recent go
 
 SHOT_RADIUS = 5
 PLAYER_SHOOT_SPEED = 500
 PLAYER_SHOOT_COOLDOWN_SECONDS = 0.3
+SHOT_LIFETIME_SECONDS = 1.5      # Shots expire instead of wrapping forever
+SHOT_MAX_LIVE = 32               # Player can't fire while this many are alive
 
 # Scoring - smaller asteroids are worth more points
 ASTEROID_SCORE = {
@@ -41,6 +46,7 @@ ASTEROID_SCORE = {
 # HUD
 HUD_FONT_SIZE = 36
 HUD_PADDING = 20
+TEXT_CACHE_SIZE = 64             # Rendered strings kept for menus and banners
 
 # Lives
 PLAYER_STARTING_LIVES = 3
@@ -52,10 +58,75 @@ WAVE_BASE_ASTEROIDS = 4          # Asteroids in wave 1
 WAVE_ASTEROIDS_INCREMENT = 2     # Additional asteroids per wave
 WAVE_DELAY_SECONDS = 2.0         # Pause between waves
 WAVE_SPEED_MULTIPLIER = 1.1      # Speed increase per wave (compounding)
+WAVE_PLAN_BUDGET = 4             # Next-wave asteroids precomputed per step of the delay
+WAVE_SPAWN_BUDGET = 8            # Wave asteroids released per step
+
+# Sound voices (voices.py): mixer channels per effect, by priority
+SOUND_PRIORITIES = {"player_hit": 2, "explosion": 1, "shoot": 0}  # Higher may take lower's channels
+SOUND_VOICES = {"player_hit": 1, "explosion": 4, "shoot": 3}      # Channels owned by each effect
+SOUND_MIN_INTERVALS = {"player_hit": 0.0, "explosion": 0.05, "shoot": 0.0}  # Seconds between plays
+SOUND_BASE_VOLUME = 0.7          # Channel volume of a single play; coalesced plays get louder
 
 # Particles
 PARTICLE_COUNT = 8               # Particles per explosion
 PARTICLE_SPEED_MIN = 50
 PARTICLE_SPEED_MAX = 150
 PARTICLE_LIFETIME = 0.6          # Seconds before particle disappears
-PARTICLE_SIZE = 3
\ No newline at end of file
+PARTICLE_SIZE = 3
+PARTICLE_MAX_LIVE = 8192         # Capacity of the particle arrays
+PARTICLE_FADE_LEVELS = 16        # Brightness steps used when drawing
+
+# Simulation timing
+SIMULATION_TICK_RATE = 60        # Fixed physics steps per second
+MAX_STEPS_PER_FRAME = 5          # Drop backlog beyond this many steps per frame
+RENDER_FPS_CAP = 60              # Frame rate limit for drawing (0 = uncapped)
+RENDER_VSYNC = False             # Lock presentation to the display refresh
+
+# Profiling
+PROFILER_ENABLED = False         # Start with the profiler on (F3 toggles it)
+PROFILER_HISTORY_FRAMES = 240    # Frames in the rolling stats and graph
+PROFILER_BUDGET_MS = 1000 / 60   # Frame budget marked on the graph
+PROFILER_OUTPUT = "frame_profile.jsonl"
+
+# Quality governor (governor.py): trades detail for frame time on slow machines
+QUALITY_GOVERNOR = True          # Let the governor lower detail when frames run long
+QUALITY_BUDGET_MS = 1000 / 60    # Target frame time
+QUALITY_WINDOW_FRAMES = 30       # Rolling window the frame time is averaged over
+QUALITY_DEGRADE_RATIO = 0.9      # Drop a level when the average passes this share of the budget
+QUALITY_RESTORE_RATIO = 0.6      # ...and only climb back once it stays under this share
+QUALITY_RESTORE_FRAMES = 180     # Frames the average must stay low before restoring a level
+QUALITY_COOLDOWN_FRAMES = 60     # Frames to wait after any change before judging again
+QUALITY_PARTICLE_SCALE = 0.4     # Share of PARTICLE_COUNT kept per explosion when reduced
+QUALITY_HUD_INTERVAL = 6         # Frames between HUD redraws when throttled
+QUALITY_SOUND_INTERVAL = 0.08    # Minimum seconds between repeats of one sound when throttled
+
+# Startup
+STARTUP_REPORT = None            # File to append stage timings to per launch (main.py --startup-report)
+
+# Logging
+LOG_FORMAT = "jsonl"             # "jsonl" or "binary" (indexed, see telemetry.py)
+LOG_TELEMETRY_PATH = "game_telemetry.bin"
+
+# Recording and replay
+RECORD_SESSIONS = False          # Save seed + inputs of every game for replay (main.py --record)
+RECORDINGS_DIR = "recordings"
+REPLAY_CHECKPOINT_INTERVAL = 60  # Ticks between recorded state hashes
+
+# Agent environment (env.py)
+ENV_NEAREST_ASTEROIDS = 8        # Asteroids described in each observation
+ENV_MAX_EPISODE_STEPS = 18000    # Truncate episodes after 5 minutes of play
+ENV_LIFE_PENALTY = 100           # Reward lost when the player is hit
+
+# Entity storage
+ENTITY_STORE_CAPACITY = 1024     # Initial rows for asteroids and shots (grows)
+
+# Collision broad-phase
+SPATIAL_HASH_CELL_SIZE = ASTEROID_MAX_RADIUS * 2  # Fits the largest asteroid
+
+# Network play (netplay.py): authoritative server streaming snapshots
+NET_HOST = "127.0.0.1"
+NET_PORT = 47800
+NET_SEND_RATE = 30               # Snapshots per second; the server ticks at SIMULATION_TICK_RATE
+NET_INTERP_DELAY = 0.1           # Seconds clients draw behind the newest snapshot
+NET_RESTART_DELAY = 3.0          # Seconds of game over before the server starts a new game
+NET_MAX_BUFFERED = 1 << 20       # Unsent bytes a client may fall behind before it is dropped
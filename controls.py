@@ -0,0 +1,26 @@
+import pygame
+
+# Player inputs packed into a single int, one bit per control
+INPUT_LEFT = 1 << 0
+INPUT_RIGHT = 1 << 1
+INPUT_THRUST = 1 << 2
+INPUT_REVERSE = 1 << 3
+INPUT_SHOOT = 1 << 4
+
+KEY_BINDINGS = {
+    pygame.K_a: INPUT_LEFT,
+    pygame.K_d: INPUT_RIGHT,
+    pygame.K_w: INPUT_THRUST,
+    pygame.K_s: INPUT_REVERSE,
+    pygame.K_SPACE: INPUT_SHOOT,
+}
+
+
+def read_keyboard():
+    """Return the currently held controls as an input bitmask."""
+    keys = pygame.key.get_pressed()
+    inputs = 0
+    for key, flag in KEY_BINDINGS.items():
+        if keys[key]:
+            inputs |= flag
+    return inputs
@@ -0,0 +1,267 @@
+import numpy as np
+import pygame
+from circleshape import CircleShape
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, ENTITY_STORE_CAPACITY
+
+
+class EntityStore:
+    """Kinematics for asteroids and shots in contiguous NumPy arrays.
+
+    Every stored entity owns one row (a slot). `update` integrates
+    positions and rotations, wraps positions and counts down lifetimes for
+    all rows at once, so per-frame movement costs a few array operations
+    instead of a Python call per sprite. Each row also carries an integer
+    tag chosen by its owner; worlds sharing one store use it to tell their
+    rows apart (see `World.bind`).
+    """
+
+    FIELDS = (
+        "positions", "velocities", "rotations", "rotation_speeds", "radii", "lifetimes",
+        "previous_positions", "previous_rotations", "render_positions", "render_rotations",
+    )
+
+    def __init__(self, capacity=ENTITY_STORE_CAPACITY):
+        self.capacity = 0
+        self.positions = np.zeros((0, 2))
+        self.velocities = np.zeros((0, 2))
+        self.rotations = np.zeros(0)
+        self.rotation_speeds = np.zeros(0)
+        self.radii = np.zeros(0)
+        self.lifetimes = np.zeros(0)
+        # State at the start of the current step and the blend drawn from
+        self.previous_positions = np.zeros((0, 2))
+        self.previous_rotations = np.zeros(0)
+        self.render_positions = np.zeros((0, 2))
+        self.render_rotations = np.zeros(0)
+        self.active = np.zeros(0, dtype=bool)
+        self.tags = np.zeros(0, dtype=np.int64)
+        self.owners = []
+        self.free = []
+        self.high = 0  # Rows at or above this index have never been used
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        old = self.capacity
+        for name in self.FIELDS + ("active", "tags"):
+            array = getattr(self, name)
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:old] = array
+            setattr(self, name, grown)
+        self.owners.extend([None] * (capacity - old))
+        self.free.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+
+    def acquire(self, owner=None, tag=0):
+        if not self.free:
+            self._grow(max(1, self.capacity * 2))
+        slot = self.free.pop()
+        self.active[slot] = True
+        self.tags[slot] = tag
+        self.lifetimes[slot] = np.inf
+        self.owners[slot] = owner
+        self.high = max(self.high, slot + 1)
+        return slot
+
+    def release(self, slot):
+        # Every column is reset, not just the ones a new owner always sets:
+        # a shot never writes its rotation, and `World.state_hash` hashes it
+        self.active[slot] = False
+        self.tags[slot] = 0
+        for name in self.FIELDS:
+            getattr(self, name)[slot] = 0
+        self.lifetimes[slot] = np.inf
+        self.owners[slot] = None
+        self.free.append(slot)
+
+    def detach(self, slot, row):
+        """Copy a row into the one-row store `row` and free the slot."""
+        if row.high == 0:
+            row.acquire()
+        for name in self.FIELDS:
+            getattr(row, name)[0] = getattr(self, name)[slot]
+        row.owners[0] = self.owners[slot]
+        self.release(slot)
+        return row
+
+    def clear(self):
+        self.active[:] = False
+        self.tags[:] = 0
+        for name in self.FIELDS:
+            getattr(self, name)[:] = 0
+        self.lifetimes[:] = np.inf
+        self.owners = [None] * self.capacity
+        self.free = list(range(self.capacity - 1, -1, -1))
+        self.high = 0
+
+    def gather(self, sprites):
+        """Positions and radii of live sprites in this store, as plain lists."""
+        slots = [sprite.slot for sprite in sprites]
+        return self.positions[slots].tolist(), self.radii[slots].tolist()
+
+    def live_slots(self):
+        return np.flatnonzero(self.active[:self.high])
+
+    def save_previous(self):
+        """Remember the current state as the start of the next step."""
+        n = self.high
+        self.previous_positions[:n] = self.positions[:n]
+        self.previous_rotations[:n] = self.rotations[:n]
+
+    def interpolate(self, alpha):
+        """Blend previous and current state into the render arrays.
+
+        Rows that wrapped around the screen during the step snap to their
+        current position rather than sweeping across the whole screen.
+        """
+        n = self.high
+        previous = self.previous_positions[:n]
+        delta = self.positions[:n] - previous
+        render = self.render_positions[:n]
+        np.multiply(delta, alpha, out=render)
+        render += previous
+        wrapped = np.abs(delta[:, 0]) > SCREEN_WIDTH / 2
+        wrapped |= np.abs(delta[:, 1]) > SCREEN_HEIGHT / 2
+        render[wrapped] = self.positions[:n][wrapped]
+        previous_rotations = self.previous_rotations[:n]
+        turned = self.rotations[:n] - previous_rotations
+        self.render_rotations[:n] = previous_rotations + turned * alpha
+
+    def update(self, dt):
+        """Integrate every row; return the owners whose lifetime ran out."""
+        n = self.high
+        if n == 0:
+            return []
+        positions = self.positions[:n]
+        positions += self.velocities[:n] * dt
+        self.rotations[:n] += self.rotation_speeds[:n] * dt
+        lifetimes = self.lifetimes[:n]
+        lifetimes -= dt
+
+        # Same rule as CircleShape.wrap_position: jump to the opposite edge
+        x = positions[:, 0]
+        y = positions[:, 1]
+        x[x > SCREEN_WIDTH] = 0
+        x[x < 0] = SCREEN_WIDTH
+        y[y > SCREEN_HEIGHT] = 0
+        y[y < 0] = SCREEN_HEIGHT
+        self.render_positions[:n] = positions
+        self.render_rotations[:n] = self.rotations[:n]
+
+        expired = np.flatnonzero(lifetimes <= 0)
+        if len(expired) == 0:
+            return []
+        owners = self.owners
+        return [owners[slot] for slot in expired.tolist()]
+
+
+class StoredCircleShape(CircleShape):
+    """A CircleShape that is a thin view over one EntityStore row.
+
+    `position` and `velocity` return fresh Vector2 copies; assign to them
+    (or use `+=`) to write back. Assigning a position is treated as a
+    teleport and is not interpolated. Drawing reads the store's render
+    arrays, which `EntityStore.interpolate` fills once per frame. When the
+    sprite is killed its row is copied out, so a dead entity still reports
+    its last state. Sprites handed out by an ObjectPool (see `create`) go
+    back to it when killed. New rows are tagged with `store_tag`.
+    """
+
+    store = None
+    pool = None
+    store_tag = 0
+
+    def __init__(self, x, y, radius):
+        self.pool_owner = None
+        self._row = None
+        self._attach()
+        super().__init__(x, y, radius)
+
+    @classmethod
+    def create(cls, x, y, radius):
+        """Build (or recycle from `cls.pool`) an entity; None if the pool is full."""
+        if cls.pool is None:
+            return cls(x, y, radius)
+        return cls.pool.acquire(x, y, radius)
+
+    def _attach(self):
+        self.entity_store = self.store if self.store is not None else default_store
+        self.slot = self.entity_store.acquire(self, self.store_tag)
+        self._detached = False
+
+    def reset(self, x, y, radius):
+        """Reinitialise a recycled sprite as if it had just been constructed."""
+        self._attach()
+        if hasattr(self, "containers"):
+            self.add(*self.containers)
+        self.position = (x, y)
+        self.velocity = (0, 0)
+        self.radius = radius
+
+    @property
+    def position(self):
+        return pygame.Vector2(*self.entity_store.positions[self.slot])
+
+    @position.setter
+    def position(self, value):
+        store, slot = self.entity_store, self.slot
+        store.positions[slot] = (value[0], value[1])
+        store.previous_positions[slot] = store.positions[slot]
+        store.render_positions[slot] = store.positions[slot]
+
+    @property
+    def velocity(self):
+        return pygame.Vector2(*self.entity_store.velocities[self.slot])
+
+    @velocity.setter
+    def velocity(self, value):
+        self.entity_store.velocities[self.slot] = (value[0], value[1])
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @radius.setter
+    def radius(self, value):
+        self._radius = value
+        self.entity_store.radii[self.slot] = value
+
+    @property
+    def lifetime(self):
+        """Seconds until the store expires this entity (inf = never)."""
+        return float(self.entity_store.lifetimes[self.slot])
+
+    @lifetime.setter
+    def lifetime(self, value):
+        self.entity_store.lifetimes[self.slot] = value
+
+    def kill(self):
+        super().kill()
+        if self._detached:
+            return
+        if self._row is None:
+            self._row = EntityStore(capacity=1)
+        self.entity_store = self.entity_store.detach(self.slot, self._row)
+        self.slot = 0
+        self._detached = True
+        if self.pool_owner is not None:
+            self.pool_owner.release(self)
+
+    def update(self, dt):
+        # Integrated in bulk by EntityStore.update
+        pass
+
+    def wrap_position(self):
+        position = self.position
+        if position.x < 0:
+            position.x = SCREEN_WIDTH
+        elif position.x > SCREEN_WIDTH:
+            position.x = 0
+        if position.y < 0:
+            position.y = SCREEN_HEIGHT
+        elif position.y > SCREEN_HEIGHT:
+            position.y = 0
+        self.position = position
+
+
+# Store used by entities created outside of a World
+default_store = EntityStore()
@@ -0,0 +1,247 @@
+import math
+import random
+import numpy as np
+from constants import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_MAX_SPEED, PLAYER_STARTING_LIVES,
+    ASTEROID_MAX_RADIUS, SHOT_MAX_LIVE, SIMULATION_TICK_RATE,
+    ENV_NEAREST_ASTEROIDS, ENV_MAX_EPISODE_STEPS, ENV_LIFE_PENALTY
+)
+from controls import INPUT_LEFT, INPUT_RIGHT, INPUT_THRUST, INPUT_REVERSE, INPUT_SHOOT
+from logger import set_logging_enabled
+from entitystore import EntityStore
+from world import World, step_worlds
+
+# Discrete action index -> input bitmask: every turn/move/fire combination
+ACTIONS = tuple(
+    turn | move | fire
+    for turn in (0, INPUT_LEFT, INPUT_RIGHT)
+    for move in (0, INPUT_THRUST, INPUT_REVERSE)
+    for fire in (0, INPUT_SHOOT)
+)
+
+PLAYER_FEATURES = 9  # x, y, vx, vy, sin, cos, invulnerable, can shoot, lives
+ASTEROID_FEATURES = 5  # dx, dy, vx, vy, radius (relative to the player)
+
+_SCREEN_SIZE = np.array((SCREEN_WIDTH, SCREEN_HEIGHT), dtype=float)
+_HALF_SCREEN = _SCREEN_SIZE / 2
+
+
+def observe_worlds(worlds, out, nearest):
+    """Write one observation row per world into `out` in a single pass.
+
+    Asteroids come straight from the entity store rows, which carry their
+    world's index in the row tag (see `World.bind`), so worlds sharing a
+    store are read with a few array operations. They are sorted by (world,
+    distance) with one lexsort and scattered into their rows; the only
+    per-world Python work is reading the player.
+    """
+    out[:] = 0
+    players = []
+    stores = {}
+    for row, world in enumerate(worlds):
+        player = world.player
+        px, py = player.position
+        vx, vy = player.velocity
+        angle = math.radians(player.rotation)
+        players.append((
+            px, py, vx / PLAYER_MAX_SPEED, vy / PLAYER_MAX_SPEED,
+            math.sin(angle), math.cos(angle),
+            player.is_invulnerable(),
+            player.shot_cooldown <= 0 and len(world.shots) < SHOT_MAX_LIVE,
+            world.lives / PLAYER_STARTING_LIVES,
+        ))
+        stores.setdefault(id(world.entities), (world.entities, {}))[1][world.index] = row
+
+    owners = []
+    slots = []
+    for store, rows in stores.values():
+        live = store.live_slots()
+        tags = store.tags[live]
+        asteroids = tags & 1 == 0
+        live = live[asteroids]
+        indices = tags[asteroids] >> 1
+        # World index -> observation row, -1 for worlds not observed here
+        lookup = np.full(max(max(rows), indices.max(initial=0)) + 1, -1)
+        lookup[list(rows)] = list(rows.values())
+        store_owners = lookup[indices]
+        observed = store_owners >= 0
+        owners.append(store_owners[observed])
+        slots.append((store, live[observed]))
+
+    players = np.array(players)
+    out[:, :PLAYER_FEATURES] = players
+    out[:, 0] /= SCREEN_WIDTH
+    out[:, 1] /= SCREEN_HEIGHT
+    owners = np.concatenate(owners)
+    total = len(owners)
+    if total == 0 or nearest == 0:
+        return out
+
+    positions = np.concatenate([store.positions[rows] for store, rows in slots])
+    # Offsets take the short way around the wrapping screen
+    offsets = positions - players[owners, :2] + _HALF_SCREEN
+    offsets %= _SCREEN_SIZE
+    offsets -= _HALF_SCREEN
+    distances = np.einsum("ij,ij->i", offsets, offsets)
+    order = np.lexsort((distances, owners))
+    owners = owners[order]
+    counts = np.bincount(owners, minlength=len(worlds))
+    starts = np.cumsum(counts) - counts
+    ranks = np.arange(total) - starts[owners]
+    keep = ranks < nearest
+    order = order[keep]
+    owners = owners[keep]
+    columns = PLAYER_FEATURES + ranks[keep] * ASTEROID_FEATURES
+    kept_offsets = offsets[order] / _SCREEN_SIZE
+    out[owners, columns] = kept_offsets[:, 0]
+    out[owners, columns + 1] = kept_offsets[:, 1]
+    velocities = np.concatenate([store.velocities[rows] for store, rows in slots])
+    radii = np.concatenate([store.radii[rows] for store, rows in slots])
+    kept_velocities = velocities[order] / PLAYER_MAX_SPEED
+    out[owners, columns + 2] = kept_velocities[:, 0]
+    out[owners, columns + 3] = kept_velocities[:, 1]
+    out[owners, columns + 4] = radii[order] / ASTEROID_MAX_RADIUS
+    return out
+
+
+class AsteroidsEnv:
+    """Gym-style wrapper around one World, for training agents.
+
+    `reset()` returns `(observation, info)` and `step(action)` returns
+    `(observation, reward, terminated, truncated, info)`. The observation
+    is a float32 vector: the player, then the nearest asteroids as
+    screen-wrapped offsets, nearest first and zero-padded. Actions index
+    ACTIONS. The reward is the score gained minus ENV_LIFE_PENALTY per
+    life lost. Nothing is drawn, and pygame doesn't need to be initialised;
+    explosions spawn no particles. `world` lets VectorAsteroidsEnv hand in
+    worlds that share one entity store.
+    """
+
+    def __init__(self, nearest=ENV_NEAREST_ASTEROIDS, max_episode_steps=ENV_MAX_EPISODE_STEPS,
+                 frame_skip=1, dt=1 / SIMULATION_TICK_RATE, logging=False, world=None):
+        set_logging_enabled(logging)
+        self.world = world if world is not None else World(particles=False)
+        self.nearest = nearest
+        self.max_episode_steps = max_episode_steps
+        self.frame_skip = frame_skip
+        self.dt = dt
+        self.observation_size = PLAYER_FEATURES + nearest * ASTEROID_FEATURES
+        self.action_count = len(ACTIONS)
+        self.steps = 0
+
+    def reset(self, seed=None):
+        info = self._restart(seed)
+        return self.observe(), info
+
+    def _restart(self, seed):
+        self.world.reset(seed)
+        self.steps = 0
+        return {"seed": self.world.seed}
+
+    def step(self, action):
+        reward, terminated, truncated, info = self._advance(action)
+        return self.observe(), reward, terminated, truncated, info
+
+    def _advance(self, action):
+        world = self.world
+        inputs = [ACTIONS[action]]
+        score, lives = world.score, world.lives
+        for _ in range(self.frame_skip):
+            step_worlds([world], self.dt, inputs)
+            if world.game_over:
+                break
+        return self._outcome(score, lives)
+
+    def _outcome(self, score, lives):
+        """Count a step that started at `score` and `lives` and report it."""
+        world = self.world
+        self.steps += 1
+        reward = world.score - score - (lives - world.lives) * ENV_LIFE_PENALTY
+        terminated = world.game_over
+        truncated = not terminated and self.steps >= self.max_episode_steps
+        info = {"score": world.score, "wave": world.wave, "lives": world.lives}
+        return reward, terminated, truncated, info
+
+    def observe(self, out=None):
+        """Fill `out` (or a new array) with the current observation."""
+        if out is None:
+            out = np.zeros(self.observation_size, dtype=np.float32)
+        observe_worlds([self.world], out.reshape(1, -1), self.nearest)
+        return out
+
+    def close(self):
+        self.world.clear()
+
+
+class VectorAsteroidsEnv:
+    """N independent games stepped together with one call.
+
+    Observations, rewards and flags come back as arrays with one row per
+    game, written into preallocated buffers. Finished games reset
+    themselves. Their last observation is in `infos[i]["final_observation"]`.
+    Every game draws from its own World's random streams, so one game
+    replays the same from its seed (`infos[i]["seed"]` after a reset)
+    whatever the other games do and whichever order they are stepped in.
+
+    All games keep their asteroids and shots in one shared EntityStore
+    and are advanced together by `step_worlds`: one integration pass for
+    every game, and the collision rules only run in games where something
+    actually touches an asteroid. Particles are never spawned.
+    """
+
+    def __init__(self, num_envs, **kwargs):
+        store = EntityStore()
+        self.envs = [
+            AsteroidsEnv(world=World(entities=store, index=i, particles=False), **kwargs)
+            for i in range(num_envs)
+        ]
+        self.worlds = [env.world for env in self.envs]
+        self.num_envs = num_envs
+        self.observation_size = self.envs[0].observation_size
+        self.action_count = self.envs[0].action_count
+        self.observations = np.zeros((num_envs, self.observation_size), dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.seeds = random.Random()
+
+    def reset(self, seed=None):
+        self.seeds.seed(seed)
+        infos = []
+        for env in self.envs:
+            infos.append(env._restart(self.seeds.getrandbits(32)))
+        self._observe()
+        return self.observations, infos
+
+    def step(self, actions):
+        envs = self.envs
+        starts = [(env.world.score, env.world.lives) for env in envs]
+        stepping = self.worlds
+        inputs = [ACTIONS[int(action)] for action in actions]
+        for _ in range(envs[0].frame_skip):
+            step_worlds(stepping, envs[0].dt, inputs)
+            # Like AsteroidsEnv, a finished game sits out the rest of the skip
+            if any(world.game_over for world in stepping):
+                inputs = [keys for keys, world in zip(inputs, stepping) if not world.game_over]
+                stepping = [world for world in stepping if not world.game_over]
+                if not stepping:
+                    break
+        infos = []
+        for i, (env, (score, lives)) in enumerate(zip(envs, starts)):
+            reward, terminated, truncated, info = env._outcome(score, lives)
+            if terminated or truncated:
+                info["final_observation"] = env.observe()
+                env._restart(self.seeds.getrandbits(32))
+            self.rewards[i] = reward
+            self.terminated[i] = terminated
+            self.truncated[i] = truncated
+            infos.append(info)
+        self._observe()
+        return self.observations, self.rewards, self.terminated, self.truncated, infos
+
+    def _observe(self):
+        observe_worlds(self.worlds, self.observations, self.envs[0].nearest)
+
+    def close(self):
+        for env in self.envs:
+            env.close()
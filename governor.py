@@ -0,0 +1,110 @@
+from collections import deque
+from constants import (
+    PARTICLE_COUNT, QUALITY_BUDGET_MS, QUALITY_WINDOW_FRAMES, QUALITY_DEGRADE_RATIO,
+    QUALITY_RESTORE_RATIO, QUALITY_RESTORE_FRAMES, QUALITY_COOLDOWN_FRAMES,
+    QUALITY_PARTICLE_SCALE, QUALITY_HUD_INTERVAL, QUALITY_SOUND_INTERVAL
+)
+from logger import log_event
+
+# Each level keeps every reduction of the levels before it
+QUALITY_LEVELS = (
+    "full",
+    "fewer particles",
+    "simple outlines",
+    "throttled hud",
+    "throttled sounds",
+)
+
+
+class QualityGovernor:
+    """Steps visual and audio detail down when frames run over budget.
+
+    Feed it the work time of every gameplay frame (`record`). When the
+    rolling average passes QUALITY_DEGRADE_RATIO of the budget it drops one
+    level; it climbs back one level only after the average has stayed below
+    QUALITY_RESTORE_RATIO for QUALITY_RESTORE_FRAMES, and waits
+    QUALITY_COOLDOWN_FRAMES after any change, so it doesn't flap.
+
+    Only cosmetic detail changes, and particles and outlines have their own
+    random streams, so replays and state hashes are unaffected.
+    Every change is logged as a "quality_level" event.
+
+    The settings are written to `world` (and its sound manager), never to
+    module or class state, so other worlds in the process keep full
+    detail. Call `apply` again after attaching sounds to the world.
+    """
+
+    def __init__(self, world=None, budget_ms=QUALITY_BUDGET_MS, window=QUALITY_WINDOW_FRAMES, enabled=True):
+        self.world = world
+        self.budget_ms = budget_ms
+        self.enabled = enabled
+        self.level = 0
+        self.samples = deque(maxlen=window)
+        self.total = 0.0
+        self.cooldown = 0
+        self.calm_frames = 0
+        self.frame = 0
+        self.changes = 0
+
+    @property
+    def name(self):
+        return QUALITY_LEVELS[self.level]
+
+    @property
+    def average_ms(self):
+        return self.total / len(self.samples) if self.samples else 0.0
+
+    def record(self, frame_ms):
+        """Add one frame's work time (ms, excluding any frame-cap sleep)."""
+        self.frame += 1
+        samples = self.samples
+        if len(samples) == samples.maxlen:
+            self.total -= samples[0]
+        samples.append(frame_ms)
+        self.total += frame_ms
+        if not self.enabled or len(samples) < samples.maxlen:
+            return
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return
+
+        average = self.average_ms
+        if average > self.budget_ms * QUALITY_DEGRADE_RATIO:
+            self.calm_frames = 0
+            if self.level < len(QUALITY_LEVELS) - 1:
+                self.set_level(self.level + 1, average)
+        elif average < self.budget_ms * QUALITY_RESTORE_RATIO and self.level > 0:
+            self.calm_frames += 1
+            if self.calm_frames >= QUALITY_RESTORE_FRAMES:
+                self.set_level(self.level - 1, average)
+        else:
+            self.calm_frames = 0
+
+    def set_level(self, level, average_ms=None):
+        previous = self.level
+        self.level = level
+        self.cooldown = QUALITY_COOLDOWN_FRAMES
+        self.calm_frames = 0
+        self.changes += 1
+        self.apply()
+        log_event("quality_level", level=level, name=self.name, previous=previous,
+                  frame_ms=None if average_ms is None else round(average_ms, 2),
+                  budget_ms=round(self.budget_ms, 2))
+
+    def apply(self):
+        """Push the current level's settings into the world and its sounds."""
+        world = self.world
+        if world is None:
+            return
+        level = self.level
+        world.explosion_count = (
+            max(1, round(PARTICLE_COUNT * QUALITY_PARTICLE_SCALE)) if level >= 1 else PARTICLE_COUNT
+        )
+        world.simplified_outlines = level >= 2
+        world.bind()
+        if world.sounds is not None:
+            world.sounds.voices.min_interval = QUALITY_SOUND_INTERVAL if level >= 4 else 0.0
+
+    def hud_due(self):
+        """Whether the HUD should be redrawn this frame."""
+        return self.level < 3 or self.frame % QUALITY_HUD_INTERVAL == 0
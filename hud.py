@@ -0,0 +1,26 @@
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, HUD_PADDING
+from textcache import TextCache, TextLabel
+
+# Rendered text is reused until the string (or HUD value) changes
+text_cache = TextCache()
+score_label = TextLabel("Score: {}")
+lives_label = TextLabel("Lives: {}")
+wave_label = TextLabel("Wave: {}")
+
+
+def draw_hud(screen, font, score, lives, wave):
+    score_text = score_label.render(font, score)
+    lives_text = lives_label.render(font, lives)
+    wave_text = wave_label.render(font, wave)
+    return [
+        screen.blit(score_text, (HUD_PADDING, HUD_PADDING)),
+        screen.blit(wave_text, (SCREEN_WIDTH // 2 - wave_text.get_width() // 2, HUD_PADDING)),
+        screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - HUD_PADDING, HUD_PADDING)),
+    ]
+
+
+def draw_centered_text(screen, font, text, y_offset=0, color="white"):
+    rendered = text_cache.render(font, text, color)
+    x = SCREEN_WIDTH // 2 - rendered.get_width() // 2
+    y = SCREEN_HEIGHT // 2 - rendered.get_height() // 2 + y_offset
+    return screen.blit(rendered, (x, y))
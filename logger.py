@@ -1,103 +1,292 @@
-import inspect
+import atexit
 import json
 import math
+import queue
+import threading
+import time
 from datetime import datetime
+import pygame
+from telemetry import TelemetryWriter
 
-__all__ = ["log_state", "log_event"]
+__all__ = [
+    "log_state", "log_event", "set_logging_enabled", "flush_logs",
+    "configure_state_logging", "register_snapshot", "unregister_snapshot",
+    "set_log_format",
+]
 
-_FPS = 60
-_MAX_SECONDS = 16
-_SPRITE_SAMPLE_LIMIT = 10  # Maximum number of sprites to log per group
+_FLUSH_BATCH_SIZE = 256  # Write out once this many records are queued
+_FLUSH_INTERVAL = 0.5  # ...or once the oldest queued record is this old (s)
+_CLOSE = object()  # Queue sentinel: write what's pending, finish the file, stop
 
 _frame_count = 0
-_state_log_initialized = False
-_event_log_initialized = False
+_enabled = True
+_sample_every = 60  # Frames between state snapshots (~1s at 60 FPS)
+_max_frames = None  # Stop snapshotting after this frame; None = whole session
+_sample_limit = 10  # Default maximum number of sprites to log per group
+_registry = {}  # name -> (kind, object, per-object sample limit)
 _start_time = datetime.now()
 
 
-def log_state():
-    global _frame_count, _state_log_initialized
+class _JsonlWriter:
+    """Serializes records to a JSONL file on a background thread.
+
+    Records are written in the order they were queued. The file is truncated
+    when the first record of the run arrives, matching the old behaviour of
+    opening it in "w" mode once and "a" mode afterwards.
+    """
+
+    def __init__(self, path, batch_size=_FLUSH_BATCH_SIZE, flush_interval=_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(
+                        target=self._run, name=f"log-writer:{self.path}", daemon=True
+                    )
+                    self.thread.start()
+        self.queue.put(record)
+
+    def flush(self):
+        """Block until everything queued so far is on disk."""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Write out everything queued and stop the writer thread."""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        self.queue.put(_CLOSE)
+        self.thread.join()
+
+    def _open(self):
+        return open(self.path, "w")
+
+    def _encode(self, record):
+        return json.dumps(record) + "\n"
+
+    def _write(self, f, pending):
+        f.write("".join(pending))
 
-    # Stop logging after `_MAX_SECONDS` seconds
-    if _frame_count > _FPS * _MAX_SECONDS:
-        return
+    def _finish(self, f):
+        pass
 
-    # Take a snapshot approx. once per second
-    _frame_count += 1
-    if _frame_count % _FPS != 0:
-        return
+    def _run(self):
+        with self._open() as f:
+            pending = []
+            deadline = None
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is not None and item is not _CLOSE and not isinstance(item, threading.Event):
+                    pending.append(self._encode(item))
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                    if len(pending) < self.batch_size:
+                        continue
+
+                # Batch full, interval elapsed or explicit flush/close request
+                if pending:
+                    self._write(f, pending)
+                    f.flush()
+                    pending.clear()
+                deadline = None
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is _CLOSE:
+                    self._finish(f)
+                    return
+
+
+class _BinaryWriter(_JsonlWriter):
+    """Writes states and events into one binary telemetry file (telemetry.py).
+
+    Queued items are (kind, record) pairs. The frame index is appended when
+    the writer is closed; a file left without one is still readable.
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.encoder = None
+
+    def _open(self):
+        f = open(self.path, "wb")
+        self.encoder = TelemetryWriter(f)
+        return f
+
+    def _encode(self, item):
+        return item
+
+    def _write(self, f, pending):
+        for kind, record in pending:
+            if kind == "state":
+                self.encoder.write_state(record)
+            else:
+                self.encoder.write_event(record)
+
+    def _finish(self, f):
+        self.encoder.close()
+
+
+class _TelemetryChannel:
+    """Routes one kind of record (state or event) into a shared _BinaryWriter."""
+
+    def __init__(self, writer, kind):
+        self.writer = writer
+        self.kind = kind
+
+    def write(self, record):
+        self.writer.write((self.kind, record))
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+
+_state_writer = _JsonlWriter("game_state.jsonl")
+_event_writer = _JsonlWriter("game_events.jsonl")
 
-    now = datetime.now()
 
-    frame = inspect.currentframe()
-    if frame is None:
-        return
+def flush_logs():
+    """Write out all queued state snapshots and events."""
+    _state_writer.flush()
+    _event_writer.flush()
 
-    frame_back = frame.f_back
-    if frame_back is None:
-        return
 
-    local_vars = frame_back.f_locals.copy()
+def _close_logs():
+    _state_writer.close()
+    _event_writer.close()
 
-    screen_size = []
-    game_state = {}
 
-    for key, value in local_vars.items():
-        if "pygame" in str(type(value)) and hasattr(value, "get_size"):
-            screen_size = value.get_size()
+atexit.register(_close_logs)
+
+
+def set_log_format(log_format, path="game_telemetry.bin"):
+    """Choose where snapshots and events go; call before anything is logged.
+
+    "jsonl" writes game_state.jsonl and game_events.jsonl, "binary" writes
+    both into one indexed telemetry file at `path` (see telemetry.py).
+    """
+    global _state_writer, _event_writer
+    if log_format not in ("jsonl", "binary"):
+        raise ValueError(f"unknown log format {log_format!r}")
+    _close_logs()
+    if log_format == "binary":
+        writer = _BinaryWriter(path)
+        _state_writer = _TelemetryChannel(writer, "state")
+        _event_writer = _TelemetryChannel(writer, "event")
+    else:
+        _state_writer = _JsonlWriter("game_state.jsonl")
+        _event_writer = _JsonlWriter("game_events.jsonl")
+
+
+def set_logging_enabled(enabled):
+    """Turn state and event logging on or off (e.g. for headless runs)."""
+    global _enabled
+    _enabled = enabled
+
 
-        if hasattr(value, "__class__") and "Group" in value.__class__.__name__:
-            sprites_data = []
+def configure_state_logging(sample_every=None, max_frames=None, sample_limit=None):
+    """Tune how often `log_state` snapshots the registered objects.
 
-            for i, sprite in enumerate(value):
-                if i >= _SPRITE_SAMPLE_LIMIT:
-                    break
+    `sample_every` is the number of frames between snapshots, `max_frames`
+    stops snapshots after that many frames (None keeps logging for the whole
+    session) and `sample_limit` is the default number of sprites written per
+    group. Arguments left as None keep their current value.
+    """
+    global _sample_every, _max_frames, _sample_limit
+    if sample_every is not None:
+        _sample_every = max(1, sample_every)
+    if max_frames is not None:
+        _max_frames = max_frames
+    if sample_limit is not None:
+        _sample_limit = sample_limit
 
-                sprite_info = {"type": sprite.__class__.__name__}
 
-                if hasattr(sprite, "position"):
-                    sprite_info["pos"] = [
-                        round(sprite.position.x, 2),
-                        round(sprite.position.y, 2),
-                    ]
+def register_snapshot(name, obj, sample_limit=None):
+    """Include `obj` in every state snapshot under the key `name`.
 
-                if hasattr(sprite, "velocity"):
-                    sprite_info["vel"] = [
-                        round(sprite.velocity.x, 2),
-                        round(sprite.velocity.y, 2),
-                    ]
+    Surfaces provide the snapshot's `screen_size`, sprite groups are written
+    as a count plus the first `sample_limit` sprites, and anything else is
+    written as a single sprite.
+    """
+    if isinstance(obj, pygame.Surface):
+        kind = "surface"
+    elif isinstance(obj, pygame.sprite.AbstractGroup):
+        kind = "group"
+    else:
+        kind = "sprite"
+    _registry[name] = (kind, obj, sample_limit)
 
-                if hasattr(sprite, "radius"):
-                    sprite_info["rad"] = sprite.radius
 
-                if hasattr(sprite, "rotation"):
-                    sprite_info["rot"] = round(sprite.rotation, 2)
+def unregister_snapshot(name):
+    _registry.pop(name, None)
 
-                sprites_data.append(sprite_info)
 
-            game_state[key] = {"count": len(value), "sprites": sprites_data}
+def _sprite_info(sprite):
+    sprite_info = {"type": sprite.__class__.__name__}
 
-        if len(game_state) == 0 and hasattr(value, "position"):
-            sprite_info = {"type": value.__class__.__name__}
+    if hasattr(sprite, "position"):
+        sprite_info["pos"] = [
+            round(sprite.position.x, 2),
+            round(sprite.position.y, 2),
+        ]
 
-            sprite_info["pos"] = [
-                round(value.position.x, 2),
-                round(value.position.y, 2),
-            ]
+    if hasattr(sprite, "velocity"):
+        sprite_info["vel"] = [
+            round(sprite.velocity.x, 2),
+            round(sprite.velocity.y, 2),
+        ]
 
-            if hasattr(value, "velocity"):
-                sprite_info["vel"] = [
-                    round(value.velocity.x, 2),
-                    round(value.velocity.y, 2),
-                ]
+    if hasattr(sprite, "radius"):
+        sprite_info["rad"] = sprite.radius
 
-            if hasattr(value, "radius"):
-                sprite_info["rad"] = value.radius
+    if hasattr(sprite, "rotation"):
+        sprite_info["rot"] = round(sprite.rotation, 2)
 
-            if hasattr(value, "rotation"):
-                sprite_info["rot"] = round(value.rotation, 2)
+    return sprite_info
 
-            game_state[key] = sprite_info
+
+def log_state():
+    global _frame_count
+
+    _frame_count += 1
+    if not _enabled or _frame_count % _sample_every != 0:
+        return
+    if _max_frames is not None and _frame_count > _max_frames:
+        return
+
+    now = datetime.now()
+    screen_size = []
+    game_state = {}
+
+    for name, (kind, obj, sample_limit) in _registry.items():
+        if kind == "surface":
+            screen_size = obj.get_size()
+        elif kind == "group":
+            limit = _sample_limit if sample_limit is None else sample_limit
+            sprites = obj.sprites()
+            game_state[name] = {
+                "count": len(sprites),
+                "sprites": [_sprite_info(sprite) for sprite in sprites[:limit]],
+            }
+        else:
+            game_state[name] = _sprite_info(obj)
 
     entry = {
         "timestamp": now.strftime("%H:%M:%S.%f")[:-3],
@@ -107,16 +296,12 @@ def log_state():
         **game_state,
     }
 
-    # New log file on each run
-    mode = "w" if not _state_log_initialized else "a"
-    with open("game_state.jsonl", mode) as f:
-        f.write(json.dumps(entry) + "\n")
-
-    _state_log_initialized = True
+    _state_writer.write(entry)
 
 
 def log_event(event_type, **details):
-    global _event_log_initialized
+    if not _enabled:
+        return
 
     now = datetime.now()
 
@@ -128,8 +313,4 @@ def log_event(event_type, **details):
         **details,
     }
 
-    mode = "w" if not _event_log_initialized else "a"
-    with open("game_events.jsonl", mode) as f:
-        f.write(json.dumps(event) + "\n")
-
-    _event_log_initialized = True
\ No newline at end of file
+    _event_writer.write(event)
@@ -1,32 +1,21 @@
+from startup import Startup
+import argparse
 import pygame
 from constants import (
-    SCREEN_WIDTH, SCREEN_HEIGHT,
-    ASTEROID_SCORE, HUD_FONT_SIZE, HUD_PADDING,
-    PLAYER_STARTING_LIVES, WAVE_DELAY_SECONDS, GameState
+    SCREEN_WIDTH, SCREEN_HEIGHT, HUD_FONT_SIZE, RENDER_FPS_CAP,
+    RENDER_VSYNC, PROFILER_ENABLED, PROFILER_OUTPUT, RECORD_SESSIONS, RECORDINGS_DIR,
+    LOG_FORMAT, LOG_TELEMETRY_PATH, STARTUP_REPORT, QUALITY_GOVERNOR, GameState
 )
-from logger import log_state, log_event
-from player import Player
-from asteroid import Asteroid
-from asteroidfield import AsteroidField
-from shot import Shot
-from particle import Particle, spawn_explosion
-from sounds import init_sounds
-
-
-def draw_hud(screen, font, score, lives, wave):
-    score_text = font.render(f"Score: {score}", True, "white")
-    lives_text = font.render(f"Lives: {lives}", True, "white")
-    wave_text = font.render(f"Wave: {wave}", True, "white")
-    screen.blit(score_text, (HUD_PADDING, HUD_PADDING))
-    screen.blit(wave_text, (SCREEN_WIDTH // 2 - wave_text.get_width() // 2, HUD_PADDING))
-    screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - HUD_PADDING, HUD_PADDING))
-
-
-def draw_centered_text(screen, font, text, y_offset=0, color="white"):
-    rendered = font.render(text, True, color)
-    x = SCREEN_WIDTH // 2 - rendered.get_width() // 2
-    y = SCREEN_HEIGHT // 2 - rendered.get_height() // 2 + y_offset
-    screen.blit(rendered, (x, y))
+from logger import log_state, register_snapshot, set_log_format
+from controls import read_keyboard
+from sounds import init_sounds, load_sound_bank
+from world import World
+from hud import text_cache, draw_hud, draw_centered_text
+from renderer import DirtyRectRenderer
+from timestep import FixedTimestep
+from profiler import Profiler
+from governor import QualityGovernor
+from replay import Recorder
 
 
 def draw_menu(screen, title_font, font):
@@ -50,178 +39,213 @@ def draw_game_over(screen, title_font, font, score, wave):
     draw_centered_text(screen, font, "Press Q to Quit to Menu", 140)
 
 
-def reset_game(updatable, drawable, asteroids, shots):
-    """Clear all game objects for a fresh start."""
-    for sprite in updatable:
-        sprite.kill()
-    for sprite in drawable:
-        sprite.kill()
-    for sprite in asteroids:
-        sprite.kill()
-    for sprite in shots:
-        sprite.kill()
-
-
-def main():
+def main(record=RECORD_SESSIONS, startup_report=STARTUP_REPORT):
     print(f"Starting Asteroids with pygame version: {pygame.__version__}")
     print(f"Screen width: {SCREEN_WIDTH}")
     print(f"Screen height: {SCREEN_HEIGHT}")
 
-    pygame.init()
-    sounds = init_sounds()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Asteroids")
+    # Only what the menu needs is set up before its first frame; the sound
+    # bank loads in the background and the in-game fonts between frames
+    startup = Startup(startup_report)
+    with startup.measure("display"):
+        pygame.display.init()
+        if RENDER_VSYNC:
+            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1)
+        else:
+            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Asteroids")
     clock = pygame.time.Clock()
+    renderer = DirtyRectRenderer(screen)
+    timestep = FixedTimestep()
+    profiler = Profiler(PROFILER_ENABLED)
+
+    # Game world and its sprite groups; sounds are attached once the mixer is up
+    world = World(None, profiler)
+    world.bind()
+    governor = QualityGovernor(world, enabled=QUALITY_GOVERNOR)
+
+    def attach_sounds(bank):
+        world.sounds = init_sounds(bank)
+        governor.apply()  # The sound throttle may already be due
+
+    startup.submit("sound bank", load_sound_bank, then=("mixer", attach_sounds))
 
     # Fonts
-    font = pygame.font.Font(None, HUD_FONT_SIZE)
-    title_font = pygame.font.Font(None, 96)
-    wave_font = pygame.font.Font(None, 72)
-
-    # Sprite groups
-    updatable = pygame.sprite.Group()
-    drawable = pygame.sprite.Group()
-    asteroids = pygame.sprite.Group()
-    shots = pygame.sprite.Group()
-
-    Player.containers = [updatable, drawable]
-    Asteroid.containers = [asteroids, updatable, drawable]
-    AsteroidField.containers = [updatable]
-    Shot.containers = [shots, updatable, drawable]
-    Particle.containers = [updatable, drawable]
+    with startup.measure("fonts"):
+        pygame.font.init()
+        font = pygame.font.Font(None, HUD_FONT_SIZE)
+        title_font = pygame.font.Font(None, 96)
+    # Fonts are created on the main thread only: SDL_ttf is not thread-safe
+    wave_font_loading = startup.defer("wave font", lambda: pygame.font.Font(None, 72))
+    profiler_font_loading = startup.defer("profiler font", lambda: pygame.font.Font(None, 22))
+    wave_font = profiler_font = None  # Taken from the deferred stages by start_game
+
+    # With `record`, every game is saved as its seed plus per-step inputs (see replay.py)
+    recorder = Recorder()
+
+    def start_game():
+        nonlocal wave_font, profiler_font
+        startup.finish()
+        wave_font = wave_font_loading.result()
+        profiler_font = profiler_font_loading.result()
+        world.reset()
+        if record:
+            recorder.start(world, timestep.step_dt)
+
+    def stop_recording():
+        path = recorder.stop(world)
+        if path:
+            print(f"Recording saved to {path}")
+
+    set_log_format(LOG_FORMAT, LOG_TELEMETRY_PATH)
+    # Objects included in the state snapshots
+    register_snapshot("screen", screen)
+    register_snapshot("updatable", world.updatable)
+    register_snapshot("drawable", world.drawable)
+    register_snapshot("asteroids", world.asteroids)
+    register_snapshot("shots", world.shots)
 
     # Game state
     state = GameState.MENU
+    shown_state = None
+    hud_rects = []
     dt = 0
-    score = 0
-    lives = PLAYER_STARTING_LIVES
-    wave = 1
-    wave_delay_timer = 0.0
-    player = None
-    asteroidfield = None
-
-    def start_new_game():
-        nonlocal score, lives, wave, wave_delay_timer, player, asteroidfield
-        reset_game(updatable, drawable, asteroids, shots)
-        score = 0
-        lives = PLAYER_STARTING_LIVES
-        wave = 1
-        wave_delay_timer = 0.0
-        player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-        asteroidfield = AsteroidField()
-        asteroidfield.spawn_wave(wave)
 
     while True:
-        log_state()
+        profiler.begin_frame()
+        with profiler.phase("logging"):
+            log_state()
 
         # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return
-
-            if event.type == pygame.KEYDOWN:
-                if state == GameState.MENU:
-                    if event.key == pygame.K_RETURN:
-                        start_new_game()
-                        state = GameState.PLAYING
-
-                elif state == GameState.PLAYING:
-                    if event.key == pygame.K_ESCAPE:
-                        state = GameState.PAUSED
-
-                elif state == GameState.PAUSED:
-                    if event.key == pygame.K_ESCAPE:
-                        state = GameState.PLAYING
-                    elif event.key == pygame.K_q:
-                        reset_game(updatable, drawable, asteroids, shots)
-                        state = GameState.MENU
-
-                elif state == GameState.GAME_OVER:
-                    if event.key == pygame.K_RETURN:
-                        start_new_game()
-                        state = GameState.PLAYING
-                    elif event.key == pygame.K_q:
-                        reset_game(updatable, drawable, asteroids, shots)
-                        state = GameState.MENU
-
-        # Clear screen
-        screen.fill("black")
+        with profiler.phase("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    stop_recording()
+                    if profiler.dump(PROFILER_OUTPUT):
+                        print(f"Frame profile written to {PROFILER_OUTPUT}")
+                    if world.sounds:
+                        print(world.sounds.voices.report())
+                    return
+
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    renderer.invalidate()
+
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle()
+                    renderer.invalidate()
+
+                if event.type == pygame.KEYDOWN:
+                    if state == GameState.MENU:
+                        if event.key == pygame.K_RETURN:
+                            start_game()
+                            state = GameState.PLAYING
+
+                    elif state == GameState.PLAYING:
+                        if event.key == pygame.K_ESCAPE:
+                            state = GameState.PAUSED
+
+                    elif state == GameState.PAUSED:
+                        if event.key == pygame.K_ESCAPE:
+                            state = GameState.PLAYING
+                        elif event.key == pygame.K_q:
+                            stop_recording()
+                            world.clear()
+                            state = GameState.MENU
+
+                    elif state == GameState.GAME_OVER:
+                        if event.key == pygame.K_RETURN:
+                            start_game()
+                            state = GameState.PLAYING
+                        elif event.key == pygame.K_q:
+                            world.clear()
+                            state = GameState.MENU
+
+        # Any state change repaints the whole screen once
+        if state != shown_state:
+            renderer.invalidate()
+            timestep.reset()
+            shown_state = state
 
         # State-specific logic
         if state == GameState.MENU:
-            draw_menu(screen, title_font, font)
+            renderer.show_static(state, lambda surface: draw_menu(surface, title_font, font))
 
         elif state == GameState.PLAYING:
-            updatable.update(dt)
-            for sprite in drawable:
-                sprite.draw(screen)
-
-            for asteroid in asteroids:
-                for shot in shots:
-                    if asteroid.collides_with(shot):
-                        log_event("asteroid_shot")
-                        score += ASTEROID_SCORE.get(asteroid.radius, 10)
-                        spawn_explosion(asteroid.position.x, asteroid.position.y)
-                        sounds.play_explosion()
-                        asteroid.split()
-                        shot.kill()
-                        break
-                if player.collides_with(asteroid) and not player.is_invulnerable():
-                    log_event("player_hit")
-                    spawn_explosion(player.position.x, player.position.y)
-                    sounds.play_player_hit()
-                    lives -= 1
-                    if lives <= 0:
-                        state = GameState.GAME_OVER
-                        break
-                    player.respawn(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-
-            # Wave transition logic
-            if state == GameState.PLAYING and len(asteroids) == 0:
-                if wave_delay_timer <= 0:
-                    wave_delay_timer = WAVE_DELAY_SECONDS
-                else:
-                    wave_delay_timer -= dt
-                    wave_announce = wave_font.render(f"Wave {wave + 1}", True, "white")
-                    screen.blit(wave_announce, (
+            inputs = read_keyboard()
+            for _ in range(timestep.advance(dt)):
+                world.step(timestep.step_dt, inputs)
+                recorder.record(world, inputs)
+                if world.game_over:
+                    stop_recording()
+                    state = GameState.GAME_OVER
+                    break
+
+            # The HUD stays on screen between redraws when the governor throttles
+            # it, unless erasing last frame's sprites would punch holes in it
+            hud_due = governor.hud_due() or renderer.erases(hud_rects)
+            with profiler.phase("draw"):
+                renderer.begin()
+                if hud_due:
+                    renderer.erase(hud_rects)
+                renderer.add(world.draw(screen, timestep.alpha))
+            with profiler.phase("hud"):
+                if state == GameState.PLAYING and world.announced_wave is not None:
+                    wave_announce = text_cache.render(wave_font, f"Wave {world.announced_wave}")
+                    renderer.add(screen.blit(wave_announce, (
                         SCREEN_WIDTH // 2 - wave_announce.get_width() // 2,
                         SCREEN_HEIGHT // 2 - wave_announce.get_height() // 2
-                    ))
-                    if wave_delay_timer <= 0:
-                        wave += 1
-                        asteroidfield.spawn_wave(wave)
-
-            draw_hud(screen, font, score, lives, wave)
+                    )))
+                if hud_due:
+                    hud_rects = draw_hud(screen, font, world.score, world.lives, world.wave)
+                    renderer.add(hud_rects, keep=True)
+            renderer.add(profiler.draw(screen, profiler_font))
+            with profiler.phase("flip"):
+                renderer.present()
 
         elif state == GameState.PAUSED:
-            # Draw game in background (frozen)
-            for sprite in drawable:
-                sprite.draw(screen)
-            draw_hud(screen, font, score, lives, wave)
-            # Draw pause overlay
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.fill("black")
-            overlay.set_alpha(150)
-            screen.blit(overlay, (0, 0))
-            draw_paused(screen, title_font, font)
+            # Frozen game under the pause overlay, composed once
+            def compose_paused(surface):
+                world.draw(surface)
+                draw_hud(surface, font, world.score, world.lives, world.wave)
+                surface.blit(renderer.overlay(150), (0, 0))
+                draw_paused(surface, title_font, font)
+
+            renderer.show_static(state, compose_paused)
 
         elif state == GameState.GAME_OVER:
             # Draw remaining particles
-            updatable.update(dt)
-            for sprite in drawable:
-                sprite.draw(screen)
-            draw_hud(screen, font, score, lives, wave)
-            # Draw game over overlay
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.fill("black")
-            overlay.set_alpha(180)
-            screen.blit(overlay, (0, 0))
-            draw_game_over(screen, title_font, font, score, wave)
-
-        time_delta = clock.tick(60)
+            inputs = read_keyboard()
+            for _ in range(timestep.advance(dt)):
+                world.update(timestep.step_dt, inputs)
+            with profiler.phase("draw"):
+                renderer.begin(full=True)
+                world.draw(screen, timestep.alpha)
+            with profiler.phase("hud"):
+                draw_hud(screen, font, world.score, world.lives, world.wave)
+                # Draw game over overlay
+                screen.blit(renderer.overlay(180), (0, 0))
+                draw_game_over(screen, title_font, font, world.score, world.wave)
+            profiler.draw(screen, profiler_font)
+            with profiler.phase("flip"):
+                renderer.present()
+
+        if world.sounds:
+            with profiler.phase("sound"):
+                world.sounds.flush()
+        startup.frame_presented()
+        profiler.end_frame()
+        time_delta = clock.tick(RENDER_FPS_CAP)
         dt = time_delta / 1000
-        pygame.display.flip()
-
+        if state == GameState.PLAYING:
+            # Work time of the frame, without the frame-cap sleep
+            governor.record(clock.get_rawtime())
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Play Asteroids.")
+    parser.add_argument("--record", action="store_true", default=RECORD_SESSIONS,
+                        help=f"save every game under {RECORDINGS_DIR}/ for replay.py")
+    parser.add_argument("--startup-report", metavar="PATH", default=STARTUP_REPORT,
+                        help="print this launch's startup stage timings and append them to PATH "
+                             "as a JSON line")
+    args = parser.parse_args()
+    main(record=args.record, startup_report=args.startup_report)
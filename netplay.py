@@ -0,0 +1,857 @@
+import argparse
+import multiprocessing
+import selectors
+import socket
+import statistics
+import struct
+import time
+from collections import deque
+import numpy as np
+import pygame
+from constants import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, SHOT_RADIUS, LINE_WIDTH, HUD_FONT_SIZE,
+    SIMULATION_TICK_RATE, RENDER_FPS_CAP, NET_HOST, NET_PORT, NET_SEND_RATE,
+    NET_INTERP_DELAY, NET_RESTART_DELAY, NET_MAX_BUFFERED
+)
+from asteroidshapes import shape_library
+from controls import read_keyboard
+from headless import PILOTS, init_headless
+from hud import draw_hud, draw_centered_text
+from particle import ParticleSystem
+from player import Player
+from sounds import init_sounds
+from world import World
+
+# Wire format. Every message is a 5 byte header (type, body length) and a
+# body; all integers are little-endian.
+MSG_HELLO = 1      # server -> client, once per connection
+MSG_SNAPSHOT = 2   # server -> client, every send tick
+MSG_INPUT = 3      # client -> server, every client frame
+
+_MESSAGE = struct.Struct("<BI")
+_HELLO = struct.Struct("<HHHH")        # tick rate, send rate, screen width, screen height
+_INPUT = struct.Struct("<IdB")         # sequence, client send time, input bitmask
+# tick, server time, echoed client time, last input sequence, game number,
+# score, lives, wave, flags, player x/y/rotation
+_SNAPSHOT = struct.Struct("<IddIHibHBHHH")
+_COUNTS = struct.Struct("<HHH")        # removed ids, full records, delta records
+_FULL = struct.Struct("<HBHHB")        # id, radius (0 = shot), x, y, rotation
+_DELTA = struct.Struct("<Hbbb")        # id, dx, dy, drotation against the last sent record
+
+FLAG_GAME_OVER = 1
+FLAG_PILOT = 2            # This client's input is steering the ship
+FLAG_PLAYER_VISIBLE = 4   # Off while the ship blinks after a respawn
+
+# Positions are sent as fixed point: 1/8 pixel steps, offset so entities
+# just off screen (spawning waves) still fit an unsigned short.
+POSITION_SCALE = 8
+POSITION_OFFSET = 512
+
+
+def quantize_position(value):
+    return min(65535, max(0, round((value + POSITION_OFFSET) * POSITION_SCALE)))
+
+
+def dequantize_position(value):
+    return value / POSITION_SCALE - POSITION_OFFSET
+
+
+def _pack_message(kind, body):
+    return _MESSAGE.pack(kind, len(body)) + body
+
+
+def _read_messages(buffer):
+    """Pop every complete (type, body) message off the front of `buffer`."""
+    messages = []
+    offset = 0
+    while len(buffer) - offset >= _MESSAGE.size:
+        kind, length = _MESSAGE.unpack_from(buffer, offset)
+        end = offset + _MESSAGE.size + length
+        if len(buffer) < end:
+            break
+        messages.append((kind, bytes(buffer[offset + _MESSAGE.size:end])))
+        offset = end
+    del buffer[:offset]
+    return messages
+
+
+class _Connection:
+    """Server side of one client: socket buffers plus its delta baseline."""
+
+    def __init__(self, sock, address, number):
+        self.sock = sock
+        self.address = address
+        self.number = number
+        self.inbox = bytearray()
+        self.outbox = bytearray()
+        self.sent = {}  # Net id -> record last queued to this client
+        self.inputs = 0
+        self.input_seq = 0
+        self.input_time = 0.0
+        self.inputs_received = 0
+        self.snapshots = 0
+        self.bytes_sent = 0
+        self.full_bytes = 0  # What the same snapshots would have cost without deltas
+        self.connected = time.perf_counter()
+        self.disconnected = None
+
+    def queue(self, data):
+        self.outbox += data
+
+    def send_pending(self):
+        """Write as much of the outbox as the socket takes without blocking.
+
+        Returns False once the client is gone (reset, broken pipe).
+        """
+        if not self.outbox:
+            return True
+        try:
+            sent = self.sock.send(self.outbox)
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            return False
+        del self.outbox[:sent]
+        self.bytes_sent += sent
+        return True
+
+
+class SimulationServer:
+    """Runs the authoritative world headless and streams snapshots to clients.
+
+    The world steps at `tick_rate` with the same `World.step` the game uses,
+    so movement, collisions, scoring and waves are exactly the local rules.
+    Every `tick_rate // send_rate` ticks each client gets a snapshot holding
+    only what changed since the last one it was sent: ids of removed
+    entities, a full record for new ones (or ones that moved too far), a
+    3 byte delta for ones that moved, and nothing at all for the rest.
+    Positions are quantized to 1/8 pixel and rotations to 256 steps; the
+    ship, which is always present, goes in the header at finer precision.
+
+    The first client to connect steers the ship; later ones spectate and
+    take over in order of arrival if it leaves. With `pilot`, a function
+    from headless.PILOTS, the server flies the ship itself and every client
+    spectates. After a game over the server starts a new game by itself.
+    """
+
+    def __init__(self, host=NET_HOST, port=NET_PORT, tick_rate=SIMULATION_TICK_RATE,
+                 send_rate=NET_SEND_RATE, seed=None, pilot=None):
+        self.tick_rate = tick_rate
+        self.send_rate = send_rate
+        self.send_every = max(1, round(tick_rate / send_rate))
+        self.seed = seed
+        self.pilot = pilot
+
+        self.world = World()
+        self.world.reset(seed)
+        self.game = 1
+        self.restart_timer = 0.0
+        self.tick = 0
+        self.ids = {}  # Live asteroid or shot -> net id
+        self.next_id = 1
+
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.clients = []
+        self.departed = []  # Closed connections, kept for the report
+        self.connections = 0
+        self.dropped = 0
+
+        self.tick_times = []
+        self.encode_times = []
+        self.started = None
+        self.elapsed = 0.0
+
+    def serve(self, duration=None):
+        """Tick in real time until `duration` seconds pass (forever if None)."""
+        dt = 1 / self.tick_rate
+        self.started = time.perf_counter()
+        next_tick = self.started
+        end = None if duration is None else self.started + duration
+        try:
+            while end is None or next_tick < end:
+                self._poll(max(0.0, next_tick - time.perf_counter()))
+                now = time.perf_counter()
+                if now - next_tick > dt * 5:
+                    # Fell far behind (suspended, debugger); don't fast-forward
+                    next_tick = now
+                while now >= next_tick:
+                    self.step(dt)
+                    next_tick += dt
+        finally:
+            self.elapsed = time.perf_counter() - self.started
+
+    def _poll(self, timeout):
+        for key, _ in self.selector.select(timeout):
+            if key.fileobj is self.listener:
+                self._accept()
+            else:
+                self._receive(key.data)
+
+    def _accept(self):
+        try:
+            sock, address = self.listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connections += 1
+        connection = _Connection(sock, address, self.connections)
+        self.clients.append(connection)
+        self.selector.register(sock, selectors.EVENT_READ, connection)
+        connection.queue(_pack_message(MSG_HELLO, _HELLO.pack(
+            self.tick_rate, self.send_rate, SCREEN_WIDTH, SCREEN_HEIGHT)))
+        self._flush(connection)
+
+    def _receive(self, connection):
+        try:
+            data = connection.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._disconnect(connection)
+            return
+        connection.inbox += data
+        for kind, body in _read_messages(connection.inbox):
+            if kind == MSG_INPUT:
+                seq, sent_at, inputs = _INPUT.unpack(body)
+                connection.input_seq = seq
+                connection.input_time = sent_at
+                connection.inputs = inputs
+                connection.inputs_received += 1
+
+    def _flush(self, connection):
+        if not connection.send_pending():
+            self._disconnect(connection)
+
+    def _disconnect(self, connection):
+        if connection not in self.clients:
+            return
+        self.selector.unregister(connection.sock)
+        connection.sock.close()
+        self.clients.remove(connection)
+        connection.disconnected = time.perf_counter()
+        self.departed.append(connection)
+
+    def close(self):
+        for connection in list(self.clients):
+            self._disconnect(connection)
+        self.selector.unregister(self.listener)
+        self.listener.close()
+        self.selector.close()
+
+    def controller(self):
+        """The connection steering the ship, or None."""
+        if self.pilot is not None or not self.clients:
+            return None
+        return self.clients[0]
+
+    def step(self, dt):
+        start = time.perf_counter()
+        world = self.world
+        if self.pilot is not None:
+            inputs = self.pilot(world)
+        else:
+            controller = self.controller()
+            inputs = controller.inputs if controller is not None else 0
+        world.step(dt, inputs)
+        if world.game_over:
+            self.restart_timer += dt
+            if self.restart_timer >= NET_RESTART_DELAY:
+                self.restart_timer = 0.0
+                world.reset(None if self.seed is None else self.seed + self.game)
+                self.game += 1
+        self._track()
+        self.tick += 1
+        if self.tick % self.send_every == 0:
+            encode_start = time.perf_counter()
+            self._broadcast()
+            self.encode_times.append(time.perf_counter() - encode_start)
+        for connection in list(self.clients):
+            self._flush(connection)
+        self.tick_times.append(time.perf_counter() - start)
+
+    def _track(self):
+        """Give every live asteroid and shot a net id, kept while it lives.
+
+        Pools only hand out sprites killed in an earlier tick, so a recycled
+        sprite has always dropped out of `ids` and gets a fresh id.
+        """
+        ids = self.ids
+        live = {}
+        for group in (self.world.asteroids, self.world.shots):
+            for sprite in group:
+                net_id = ids.get(sprite)
+                if net_id is None:
+                    net_id = self.next_id
+                    self.next_id = self.next_id % 65535 + 1
+                live[sprite] = net_id
+        self.ids = live
+
+    def records(self):
+        """Quantized (radius, x, y, rotation) of every live entity, by net id."""
+        world = self.world
+        store = world.entities
+        records = {}
+        for group, is_shot in ((world.asteroids, False), (world.shots, True)):
+            sprites = group.sprites()
+            if not sprites:
+                continue
+            slots = [sprite.slot for sprite in sprites]
+            positions = np.clip(np.rint((store.positions[slots] + POSITION_OFFSET) * POSITION_SCALE), 0, 65535)
+            rotations = np.rint(store.rotations[slots] * (256 / 360)).astype(np.int64) % 256
+            radii = [0] * len(sprites) if is_shot else store.radii[slots].astype(np.int64).tolist()
+            ids = self.ids
+            for sprite, radius, (x, y), rotation in zip(
+                    sprites, radii, positions.astype(np.int64).tolist(), rotations.tolist()):
+                records[ids[sprite]] = (radius, x, y, rotation)
+        return records
+
+    def _broadcast(self):
+        if not self.clients:
+            return
+        world = self.world
+        player = world.player
+        records = self.records()
+        base_flags = (FLAG_GAME_OVER if world.game_over else 0) | (FLAG_PLAYER_VISIBLE if player.visible else 0)
+        player_x = quantize_position(player.position.x)
+        player_y = quantize_position(player.position.y)
+        player_rotation = round(player.rotation % 360 * 65536 / 360) % 65536
+        server_time = time.perf_counter()
+        controller = self.controller()
+        full_size = _MESSAGE.size + _SNAPSHOT.size + _COUNTS.size + len(records) * _FULL.size
+
+        for connection in list(self.clients):
+            flags = base_flags | (FLAG_PILOT if connection is controller else 0)
+            header = _SNAPSHOT.pack(
+                self.tick, server_time, connection.input_time, connection.input_seq, self.game,
+                world.score, world.lives, world.wave, flags, player_x, player_y, player_rotation)
+            body = header + self.encode_entities(connection.sent, records)
+            if len(connection.outbox) + len(body) > NET_MAX_BUFFERED:
+                # Not reading; dropping it is kinder than growing without bound
+                self._disconnect(connection)
+                self.dropped += 1
+                continue
+            connection.queue(_pack_message(MSG_SNAPSHOT, body))
+            connection.sent = records
+            connection.snapshots += 1
+            connection.full_bytes += full_size
+
+    @staticmethod
+    def encode_entities(sent, records):
+        """Entity part of a snapshot, taking the receiver from `sent` to `records`."""
+        removed = [net_id for net_id in sent if net_id not in records]
+        full = []
+        delta = []
+        for net_id, record in records.items():
+            old = sent.get(net_id)
+            if old is not None and old[0] == record[0]:
+                dx = record[1] - old[1]
+                dy = record[2] - old[2]
+                rotation = (record[3] - old[3] + 128) % 256 - 128
+                if not (dx or dy or rotation):
+                    continue
+                if -128 <= dx <= 127 and -128 <= dy <= 127:
+                    delta.append(_DELTA.pack(net_id, dx, dy, rotation))
+                    continue
+            full.append(_FULL.pack(net_id, *record))
+        return b"".join([
+            _COUNTS.pack(len(removed), len(full), len(delta)),
+            struct.pack(f"<{len(removed)}H", *removed),
+            *full,
+            *delta,
+        ])
+
+    def summary(self):
+        elapsed = self.elapsed or (time.perf_counter() - self.started if self.started else 0.0)
+        clients = []
+        for connection in sorted(self.departed + self.clients, key=lambda c: c.number):
+            until = connection.disconnected or time.perf_counter()
+            seconds = max(until - connection.connected, 1e-9)
+            clients.append({
+                "client": connection.number,
+                "snapshots": connection.snapshots,
+                "bytes": connection.bytes_sent,
+                "bytes_per_second": connection.bytes_sent / seconds,
+                "mean_snapshot_bytes": connection.bytes_sent / connection.snapshots if connection.snapshots else 0.0,
+                "full_snapshot_bytes": connection.full_bytes / connection.snapshots if connection.snapshots else 0.0,
+                "inputs": connection.inputs_received,
+            })
+        tick_ms = [t * 1000 for t in self.tick_times]
+        encode_ms = [t * 1000 for t in self.encode_times]
+        return {
+            "seconds": elapsed,
+            "ticks": self.tick,
+            "tick_rate": self.tick / elapsed if elapsed > 0 else 0.0,
+            "games": self.game,
+            "connections": self.connections,
+            "dropped": self.dropped,
+            "tick_ms_mean": statistics.fmean(tick_ms) if tick_ms else 0.0,
+            "tick_ms_max": max(tick_ms, default=0.0),
+            "encode_ms_mean": statistics.fmean(encode_ms) if encode_ms else 0.0,
+            "clients": clients,
+        }
+
+
+class _Snapshot:
+    __slots__ = ("tick", "server_time", "received", "entities", "player", "score", "lives",
+                 "wave", "flags", "game")
+
+
+class SnapshotClient:
+    """Connects to a SimulationServer and rebuilds its world for drawing.
+
+    Snapshots are applied on top of the previous one as they arrive and
+    kept in a short buffer. `sample()` returns the world as it was
+    `interp_delay` seconds before the newest snapshot, blended between the
+    two snapshots around that moment, so motion stays smooth between
+    updates and a late packet rarely leaves nothing to blend towards.
+
+    Server and client clocks are never compared directly: the smallest
+    seen difference between a snapshot's server time and its arrival is
+    taken as the offset between them (it also absorbs the fastest delivery).
+    Round trips are measured by the server echoing the send time of the
+    last input it received.
+    """
+
+    def __init__(self, host=NET_HOST, port=NET_PORT, interp_delay=NET_INTERP_DELAY, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setblocking(False)
+        self.interp_delay = interp_delay
+        self.inbox = bytearray()
+        self.outbox = bytearray()  # Inputs the socket hasn't taken yet, kept whole
+        self.connected = True
+        self.hello = None
+        self.entities = {}  # Net id -> quantized record, as the server last sent it
+        self.buffer = deque(maxlen=64)
+        self.events = deque()  # (server time, name, x, y), released by `sample`
+        self.clock_offset = None
+        self.input_seq = 0
+        self.acked_seq = 0
+
+        self.started = time.perf_counter()
+        self.snapshots = 0
+        self.bytes_received = 0
+        self.round_trips = deque(maxlen=10000)
+        self.gaps = deque(maxlen=10000)
+        self.frames = 0
+        self.held_frames = 0  # Frames drawn past the newest snapshot (nothing to blend to)
+
+    def close(self):
+        if self.connected:
+            self.sock.close()
+            self.connected = False
+
+    def send_input(self, inputs):
+        if not self.connected:
+            return
+        self.input_seq += 1
+        self.outbox += _pack_message(MSG_INPUT, _INPUT.pack(self.input_seq, time.perf_counter(), inputs))
+        if len(self.outbox) > NET_MAX_BUFFERED:
+            self.close()  # The server stopped reading
+            return
+        self._send_pending()
+
+    def _send_pending(self):
+        """Write what the socket takes; the rest stays queued, so messages never tear."""
+        if not self.outbox:
+            return
+        try:
+            sent = self.sock.send(self.outbox)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self.close()
+            return
+        del self.outbox[:sent]
+
+    def poll(self):
+        """Send queued input, then read and apply everything the server has sent so far."""
+        self._send_pending()
+        while self.connected:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                data = b""
+            if not data:
+                self.close()
+                break
+            self.bytes_received += len(data)
+            self.inbox += data
+        now = time.perf_counter()
+        for kind, body in _read_messages(self.inbox):
+            if kind == MSG_SNAPSHOT:
+                self._apply(body, now)
+            elif kind == MSG_HELLO:
+                self.hello = _HELLO.unpack(body)
+
+    def _apply(self, body, now):
+        (tick, server_time, echoed, input_seq, game, score, lives, wave, flags,
+         player_x, player_y, player_rotation) = _SNAPSHOT.unpack_from(body)
+        offset = _SNAPSHOT.size
+        removed_count, full_count, delta_count = _COUNTS.unpack_from(body, offset)
+        offset += _COUNTS.size
+        removed = struct.unpack_from(f"<{removed_count}H", body, offset)
+        offset += removed_count * 2
+
+        previous = self.buffer[-1] if self.buffer else None
+        same_game = previous is not None and previous.game == game
+        entities = self.entities
+        for net_id in removed:
+            record = entities.pop(net_id, None)
+            if record is not None and record[0] and same_game:
+                self.events.append((server_time, "explosion",
+                                    dequantize_position(record[1]), dequantize_position(record[2])))
+        for _ in range(full_count):
+            net_id, *record = _FULL.unpack_from(body, offset)
+            offset += _FULL.size
+            if net_id not in entities and record[0] == 0 and same_game:
+                self.events.append((server_time, "shoot", None, None))
+            entities[net_id] = tuple(record)
+        for _ in range(delta_count):
+            net_id, dx, dy, rotation = _DELTA.unpack_from(body, offset)
+            offset += _DELTA.size
+            radius, x, y, old_rotation = entities[net_id]
+            entities[net_id] = (radius, x + dx, y + dy, (old_rotation + rotation) % 256)
+
+        snapshot = _Snapshot()
+        snapshot.tick = tick
+        snapshot.server_time = server_time
+        snapshot.received = now
+        snapshot.entities = {
+            net_id: (radius, dequantize_position(x), dequantize_position(y), rotation * 360 / 256)
+            for net_id, (radius, x, y, rotation) in entities.items()
+        }
+        snapshot.player = (dequantize_position(player_x), dequantize_position(player_y),
+                           player_rotation * 360 / 65536)
+        snapshot.score = score
+        snapshot.lives = lives
+        snapshot.wave = wave
+        snapshot.flags = flags
+        snapshot.game = game
+        if same_game and lives < previous.lives:
+            self.events.append((server_time, "player_hit", *previous.player[:2]))
+
+        if previous is not None:
+            self.gaps.append(now - previous.received)
+        self.buffer.append(snapshot)
+        self.snapshots += 1
+        offset_estimate = now - server_time
+        if self.clock_offset is None or offset_estimate < self.clock_offset:
+            self.clock_offset = offset_estimate
+        if input_seq != self.acked_seq and echoed:
+            self.acked_seq = input_seq
+            self.round_trips.append(now - echoed)
+
+    def sample(self, now=None):
+        """The interpolated world to draw now, or None before the first snapshot.
+
+        Returns (snapshot, entities, player, events): the snapshot supplies
+        score, lives, wave and flags; entities are (net id, radius, x, y,
+        rotation); player is (x, y, rotation); events are (name, x, y) due
+        since the last call.
+        """
+        if not self.buffer:
+            return None
+        now = time.perf_counter() if now is None else now
+        render_time = now - self.clock_offset - self.interp_delay
+        buffer = self.buffer
+        self.frames += 1
+
+        newest = buffer[-1]
+        if render_time >= newest.server_time:
+            self.held_frames += 1
+            a = b = newest
+        elif render_time <= buffer[0].server_time:
+            a = b = buffer[0]
+        else:
+            index = len(buffer) - 1
+            while buffer[index - 1].server_time > render_time:
+                index -= 1
+            a, b = buffer[index - 1], buffer[index]
+        span = b.server_time - a.server_time
+        alpha = (render_time - a.server_time) / span if span > 0 else 1.0
+
+        entities = []
+        old_entities = a.entities
+        for net_id, (radius, x, y, rotation) in b.entities.items():
+            old = old_entities.get(net_id)
+            if old is not None and old[0] == radius:
+                x, y, rotation = _blend(old[1:], (x, y, rotation), alpha)
+            entities.append((net_id, radius, x, y, rotation))
+        player = _blend(a.player, b.player, alpha)
+
+        events = []
+        while self.events and self.events[0][0] <= render_time:
+            events.append(self.events.popleft()[1:])
+        return b, entities, player, events
+
+    def summary(self):
+        seconds = time.perf_counter() - self.started
+        round_trips = sorted(t * 1000 for t in self.round_trips)
+        gaps = [t * 1000 for t in self.gaps]
+        rtt_mean = statistics.fmean(round_trips) if round_trips else 0.0
+        return {
+            "seconds": seconds,
+            "snapshots": self.snapshots,
+            "snapshot_rate": self.snapshots / seconds if seconds > 0 else 0.0,
+            "bytes": self.bytes_received,
+            "bytes_per_second": self.bytes_received / seconds if seconds > 0 else 0.0,
+            "gap_ms_mean": statistics.fmean(gaps) if gaps else 0.0,
+            "gap_ms_max": max(gaps, default=0.0),
+            "rtt_ms_mean": rtt_mean,
+            "rtt_ms_p50": _percentile(round_trips, 0.5),
+            "rtt_ms_p95": _percentile(round_trips, 0.95),
+            "rtt_ms_max": round_trips[-1] if round_trips else 0.0,
+            # What a viewer sees lags the server by the trip over plus the buffer
+            "display_latency_ms": rtt_mean / 2 + self.interp_delay * 1000,
+            "frames": self.frames,
+            "held_frames": self.held_frames,
+        }
+
+
+def _blend(old, new, alpha):
+    """Interpolate (x, y, rotation), snapping across screen wraps."""
+    x0, y0, r0 = old
+    x1, y1, r1 = new
+    dx = x1 - x0
+    dy = y1 - y0
+    if abs(dx) > SCREEN_WIDTH / 2 or abs(dy) > SCREEN_HEIGHT / 2:
+        return x1, y1, r1
+    turn = (r1 - r0 + 180) % 360 - 180
+    return x0 + dx * alpha, y0 + dy * alpha, r0 + turn * alpha
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class ClientView:
+    """Draws a SnapshotClient's samples with the game's own sprites and HUD."""
+
+    def __init__(self, screen, font, sounds=None):
+        self.screen = screen
+        self.font = font
+        self.sounds = sounds
+        self.ship = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)  # Only for its triangle
+        self.particles = ParticleSystem()
+        self.shapes = {}  # Net id -> outline, picked when the asteroid first shows up
+
+    def draw(self, sample, dt):
+        screen = self.screen
+        screen.fill("black")
+        if sample is None:
+            draw_centered_text(screen, self.font, "Waiting for server...")
+            return
+        snapshot, entities, (x, y, rotation), events = sample
+
+        for name, event_x, event_y in events:
+            if event_x is not None:
+                self.particles.spawn_explosion(event_x, event_y)
+            if self.sounds is not None:
+                self.sounds.play(name)
+        self.particles.update(dt)
+
+        shapes = self.shapes
+        live = {}
+        for net_id, radius, entity_x, entity_y, entity_rotation in entities:
+            if radius == 0:
+                pygame.draw.circle(screen, "white", (entity_x, entity_y), SHOT_RADIUS, width=LINE_WIDTH)
+                continue
+            shape = shapes.get(net_id)
+            if shape is None or shape.radius != radius:
+                shape = shape_library.pick(radius)
+            live[net_id] = shape
+            half = shape.half_size
+            screen.blit(shape.frame(entity_rotation), (entity_x - half, entity_y - half))
+        self.shapes = live
+        self.particles.draw(screen)
+
+        if snapshot.flags & FLAG_PLAYER_VISIBLE and not snapshot.flags & FLAG_GAME_OVER:
+            triangle = self.ship.triangle(pygame.Vector2(x, y), rotation)
+            pygame.draw.polygon(screen, "white", triangle, width=LINE_WIDTH)
+        draw_hud(screen, self.font, snapshot.score, snapshot.lives, snapshot.wave)
+        if snapshot.flags & FLAG_GAME_OVER:
+            draw_centered_text(screen, self.font, "GAME OVER - new game starting")
+        elif not snapshot.flags & FLAG_PILOT:
+            draw_centered_text(screen, self.font, "Spectating", SCREEN_HEIGHT // 2 - HUD_FONT_SIZE, "gray")
+        if self.sounds is not None:
+            self.sounds.flush()
+
+
+def run_client(host=NET_HOST, port=NET_PORT, duration=None, headless=False,
+               interp_delay=NET_INTERP_DELAY, fps=RENDER_FPS_CAP):
+    """Connect, send input and draw (or just consume) snapshots; returns client stats."""
+    client = SnapshotClient(host, port, interp_delay)
+    view = None
+    if not headless:
+        pygame.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Asteroids (network)")
+        view = ClientView(screen, pygame.font.Font(None, HUD_FONT_SIZE), init_sounds())
+
+    clock = pygame.time.Clock()
+    start = time.perf_counter()
+    running = True
+    try:
+        while running and client.connected:
+            if duration is not None and time.perf_counter() - start >= duration:
+                break
+            dt = clock.tick(fps) / 1000
+            inputs = 0
+            if view is not None:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                inputs = read_keyboard()
+            client.send_input(inputs)
+            client.poll()
+            sample = client.sample()
+            if view is not None:
+                view.draw(sample, dt)
+                pygame.display.flip()
+    finally:
+        client.close()
+        if view is not None:
+            pygame.quit()
+    return client.summary()
+
+
+def _serve_process(host, port, duration, seed, pilot_name, ready, results):
+    init_headless()
+    pilot = PILOTS[pilot_name] if pilot_name else None
+    server = SimulationServer(host, port, seed=seed, pilot=pilot)
+    ready.put(server.address[1])
+    try:
+        server.serve(duration)
+        results.put(server.summary())
+    finally:
+        server.close()
+
+
+def _client_thread(port, duration, interp_delay, results):
+    results.append(run_client(NET_HOST, port, duration, headless=True, interp_delay=interp_delay))
+
+
+def loopback(clients=2, duration=10.0, seed=None, pilot="hunter", interp_delay=NET_INTERP_DELAY):
+    """Run a server process and headless clients on localhost; returns both summaries."""
+    import threading
+
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    results = context.Queue()
+    # Port 0: let the OS pick a free one, reported back through `ready`
+    process = context.Process(target=_serve_process,
+                              args=(NET_HOST, 0, duration + 1.0, seed, pilot, ready, results))
+    process.start()
+    try:
+        port = ready.get(timeout=30)
+        client_results = []
+        threads = [threading.Thread(target=_client_thread, args=(port, duration, interp_delay, client_results))
+                   for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        server_summary = results.get(timeout=30)
+    finally:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    return server_summary, client_results
+
+
+def format_server_report(server_summary):
+    lines = [
+        f"Server: {server_summary['ticks']} ticks in {server_summary['seconds']:.1f}s "
+        f"({server_summary['tick_rate']:.1f}/s), tick {server_summary['tick_ms_mean']:.2f} ms mean / "
+        f"{server_summary['tick_ms_max']:.2f} ms max, encode {server_summary['encode_ms_mean']:.3f} ms, "
+        f"{server_summary['games']} game(s), {server_summary['connections']} connection(s)",
+    ]
+    for client in server_summary["clients"]:
+        full = client["full_snapshot_bytes"]
+        saved = 1 - client["mean_snapshot_bytes"] / full if full else 0.0
+        lines.append(
+            f"  to client {client['client']}: {client['snapshots']} snapshots, "
+            f"{client['bytes_per_second'] / 1024:.2f} KiB/s, {client['mean_snapshot_bytes']:.0f} B mean "
+            f"vs {full:.0f} B full ({saved:.0%} saved), {client['inputs']} inputs")
+    return "\n".join(lines)
+
+
+def format_client_report(client_summaries):
+    lines = []
+    for number, client in enumerate(client_summaries, 1):
+        lines.append(
+            f"Client {number}: {client['snapshots']} snapshots ({client['snapshot_rate']:.1f}/s), "
+            f"{client['bytes_per_second'] / 1024:.2f} KiB/s, gap {client['gap_ms_mean']:.1f} ms mean / "
+            f"{client['gap_ms_max']:.1f} ms max")
+        lines.append(
+            f"  rtt {client['rtt_ms_mean']:.2f} ms mean, {client['rtt_ms_p50']:.2f} p50, "
+            f"{client['rtt_ms_p95']:.2f} p95, {client['rtt_ms_max']:.2f} max; "
+            f"display latency ~{client['display_latency_ms']:.0f} ms; "
+            f"{client['held_frames']}/{client['frames']} frames past the newest snapshot")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game as a snapshot server and clients.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("server", help="run the authoritative simulation")
+    serve.add_argument("--host", default=NET_HOST)
+    serve.add_argument("--port", type=int, default=NET_PORT)
+    serve.add_argument("--seed", type=int, default=None)
+    serve.add_argument("--pilot", choices=sorted(PILOTS), default=None, help="fly the ship with a headless.py pilot")
+    serve.add_argument("--duration", type=float, default=None)
+
+    join = commands.add_parser("client", help="connect and draw the game")
+    join.add_argument("--host", default=NET_HOST)
+    join.add_argument("--port", type=int, default=NET_PORT)
+    join.add_argument("--delay", type=float, default=NET_INTERP_DELAY, help="interpolation delay in seconds")
+    join.add_argument("--headless", action="store_true", help="don't open a window, just report")
+    join.add_argument("--duration", type=float, default=None)
+
+    test = commands.add_parser("loopback", help="server plus headless clients on localhost, then report")
+    test.add_argument("--clients", type=int, default=2)
+    test.add_argument("--duration", type=float, default=10.0)
+    test.add_argument("--seed", type=int, default=None)
+    test.add_argument("--pilot", choices=sorted(PILOTS), default="hunter")
+    test.add_argument("--delay", type=float, default=NET_INTERP_DELAY, help="interpolation delay in seconds")
+    args = parser.parse_args()
+
+    if args.command == "server":
+        init_headless()
+        server = SimulationServer(args.host, args.port, seed=args.seed,
+                                  pilot=PILOTS[args.pilot] if args.pilot else None)
+        print(f"Serving on {server.address[0]}:{server.address[1]}")
+        try:
+            server.serve(args.duration)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(format_server_report(server.summary()))
+            server.close()
+    elif args.command == "client":
+        if args.headless:
+            init_headless()
+        summary = run_client(args.host, args.port, args.duration, args.headless, args.delay)
+        print(format_client_report([summary]))
+    else:
+        server_summary, client_summaries = loopback(args.clients, args.duration, args.seed,
+                                                    args.pilot, args.delay)
+        print(format_server_report(server_summary))
+        print(format_client_report(client_summaries))
+
+
+if __name__ == "__main__":
+    main()
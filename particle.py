@@ -1,43 +1,110 @@
 import pygame
-import random
-import math
+import numpy as np
+from randomness import random_service
 from constants import (
     PARTICLE_COUNT, PARTICLE_SPEED_MIN, PARTICLE_SPEED_MAX,
-    PARTICLE_LIFETIME, PARTICLE_SIZE
+    PARTICLE_LIFETIME, PARTICLE_SIZE, PARTICLE_MAX_LIVE,
+    PARTICLE_FADE_LEVELS
 )
 
 
-class Particle(pygame.sprite.Sprite):
-    def __init__(self, x, y, angle):
+class ParticleSystem(pygame.sprite.Sprite):
+    """All explosion particles, stored as flat NumPy arrays.
+
+    Live particles are packed at the front of the arrays, so integrating,
+    fading and culling them is a handful of vectorized operations per frame
+    no matter how many explosions are on screen.
+    """
+
+    explosion_count = PARTICLE_COUNT  # Default per explosion; World.bind sets its world's value
+
+    def __init__(self, capacity=PARTICLE_MAX_LIVE):
         if hasattr(self, "containers"):
             super().__init__(self.containers)
         else:
             super().__init__()
 
-        self.position = pygame.Vector2(x, y)
-        speed = random.uniform(PARTICLE_SPEED_MIN, PARTICLE_SPEED_MAX)
-        self.velocity = pygame.Vector2(
-            math.cos(angle) * speed,
-            math.sin(angle) * speed
-        )
-        self.lifetime = PARTICLE_LIFETIME
-        self.max_lifetime = PARTICLE_LIFETIME
+        self.capacity = capacity
+        self.count = 0
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float32)
+        self.lifetimes = np.zeros(capacity, dtype=np.float32)
+        self.spawned = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.last_dt = 0.0
 
-    def draw(self, screen):
-        alpha = self.lifetime / self.max_lifetime
-        color = (int(255 * alpha), int(255 * alpha), int(255 * alpha))
-        pygame.draw.circle(screen, color, self.position, PARTICLE_SIZE)
+        # One pre-rendered dot per brightness step; drawing is a single blits()
+        self.sprites = []
+        for level in range(PARTICLE_FADE_LEVELS):
+            shade = int(255 * (level + 1) / PARTICLE_FADE_LEVELS)
+            dot = pygame.Surface((PARTICLE_SIZE * 2, PARTICLE_SIZE * 2))
+            dot.set_colorkey((0, 0, 0))
+            pygame.draw.circle(dot, (shade, shade, shade), (PARTICLE_SIZE, PARTICLE_SIZE), PARTICLE_SIZE)
+            self.sprites.append(dot)
 
-    def update(self, dt):
-        self.position += self.velocity * dt
-        self.lifetime -= dt
-        if self.lifetime <= 0:
-            self.kill()
+    def spawn_explosion(self, x, y, count=None):
+        if count is None:
+            count = self.explosion_count
+        room = min(count, self.capacity - self.count)
+        self.dropped += count - room
+        count = room
+        if count <= 0:
+            return
+        start, end = self.count, self.count + count
+
+        angles = (2 * np.pi / count) * np.arange(count)
+        rng = random_service.particles
+        angles += rng.uniform(-0.3, 0.3, count)
+        speeds = rng.uniform(PARTICLE_SPEED_MIN, PARTICLE_SPEED_MAX, count)
 
+        self.positions[start:end] = (x, y)
+        self.velocities[start:end, 0] = np.cos(angles) * speeds
+        self.velocities[start:end, 1] = np.sin(angles) * speeds
+        self.lifetimes[start:end] = PARTICLE_LIFETIME
+        self.count = end
+        self.spawned += count
+        self.high_water = max(self.high_water, end)
+
+    def stats(self):
+        # The arrays are the pool: every spawn reuses a preallocated slot
+        # (a hit) and particles that don't fit are dropped (a miss).
+        return {
+            "live": self.count,
+            "free": self.capacity - self.count,
+            "hits": self.spawned,
+            "misses": self.dropped,
+            "high_water": self.high_water,
+        }
+
+    def clear(self):
+        self.count = 0
+
+    def update(self, dt):
+        self.last_dt = dt
+        n = self.count
+        if n == 0:
+            return
+        self.positions[:n] += self.velocities[:n] * dt
+        self.lifetimes[:n] -= dt
 
-def spawn_explosion(x, y):
-    for i in range(PARTICLE_COUNT):
-        angle = (2 * math.pi / PARTICLE_COUNT) * i
-        angle += random.uniform(-0.3, 0.3)
-        Particle(x, y, angle)
+        alive = self.lifetimes[:n] > 0
+        live = int(np.count_nonzero(alive))
+        if live < n:
+            # Pack survivors to the front, keeping their order
+            self.positions[:live] = self.positions[:n][alive]
+            self.velocities[:live] = self.velocities[:n][alive]
+            self.lifetimes[:live] = self.lifetimes[:n][alive]
+            self.count = live
 
+    def draw(self, screen, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return None
+        fade = self.lifetimes[:n] / PARTICLE_LIFETIME
+        levels = np.clip((fade * PARTICLE_FADE_LEVELS).astype(np.int32), 0, PARTICLE_FADE_LEVELS - 1)
+        # Step back along the velocity to where the particle was at `alpha`
+        lag = self.last_dt * (1 - alpha)
+        corners = (self.positions[:n] - self.velocities[:n] * lag - PARTICLE_SIZE).astype(np.int32).tolist()
+        sprites = self.sprites
+        return screen.blits([(sprites[level], corner) for level, corner in zip(levels.tolist(), corners)])
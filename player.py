@@ -1,13 +1,46 @@
 from circleshape import CircleShape
 from shot import Shot
+from controls import (
+    INPUT_LEFT, INPUT_RIGHT, INPUT_THRUST, INPUT_REVERSE, INPUT_SHOOT
+)
 from constants import (
-    PLAYER_RADIUS, LINE_WIDTH, PLAYER_TURN_SPEED,
+    SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_RADIUS, LINE_WIDTH, PLAYER_TURN_SPEED,
     PLAYER_ACCELERATION, PLAYER_MAX_SPEED, PLAYER_DRAG,
     SHOT_RADIUS, PLAYER_SHOOT_SPEED, PLAYER_SHOOT_COOLDOWN_SECONDS,
     PLAYER_INVULNERABILITY_SECONDS, PLAYER_BLINK_RATE
 )
 import sounds as sound_module
 import pygame
+import math
+import numpy as np
+
+# Rounding allowance for the bounding-circle rejection, so it never rejects
+# a circle the exact triangle test would accept
+_HULL_SLACK = 1e-6
+
+
+def _segment_hits_circle(sx, sy, ex, ey, cx, cy, radius):
+    """Check if a line segment intersects a circle."""
+    # Vector from line start to end
+    lx = ex - sx
+    ly = ey - sy
+    # Vector from line start to circle center
+    tx = cx - sx
+    ty = cy - sy
+
+    # Project circle center onto line
+    length_sq = lx * lx + ly * ly
+    if length_sq == 0:
+        return math.sqrt(tx * tx + ty * ty) <= radius
+
+    # Find closest point on line segment to circle center
+    t = max(0, min(1, (tx * lx + ty * ly) / length_sq))
+    dx = (sx + lx * t) - cx
+    dy = (sy + ly * t) - cy
+
+    # Check distance from closest point to circle center
+    return math.sqrt(dx * dx + dy * dy) <= radius
+
 
 class Player(CircleShape):
     def __init__(self, x, y):
@@ -17,70 +50,145 @@ class Player(CircleShape):
         self.invulnerable_timer = 0.0
         self.blink_timer = 0.0
         self.visible = True
-
-    def triangle(self):
-        forward = pygame.Vector2(0, 1).rotate(self.rotation)
-        right = pygame.Vector2(0, 1).rotate(self.rotation + 90) * self.radius / 1.5
-        a = self.position + forward * self.radius
-        b = self.position - forward * self.radius - right
-        c = self.position - forward * self.radius + right
+        self.inputs = 0
+        self.previous_position = pygame.Vector2(x, y)
+        self.previous_rotation = 0
+        self._hull_key = None
+        self._hull = None
+
+    def triangle(self, position=None, rotation=None):
+        if position is None:
+            position = self.position
+        if rotation is None:
+            rotation = self.rotation
+        forward = pygame.Vector2(0, 1).rotate(rotation)
+        right = pygame.Vector2(0, 1).rotate(rotation + 90) * self.radius / 1.5
+        a = position + forward * self.radius
+        b = position - forward * self.radius - right
+        c = position - forward * self.radius + right
         return [a, b, c]
-    
-    def draw(self, screen):
-        if self.visible:
-            pygame.draw.polygon(screen, "white", self.triangle(), width=LINE_WIDTH)
+
+    def save_previous(self):
+        self.previous_position = pygame.Vector2(self.position)
+        self.previous_rotation = self.rotation
+
+    def draw(self, screen, alpha=1.0):
+        if not self.visible:
+            return None
+        position = self.position
+        delta = position - self.previous_position
+        # Don't sweep across the screen when wrapping
+        if abs(delta.x) <= SCREEN_WIDTH / 2 and abs(delta.y) <= SCREEN_HEIGHT / 2:
+            position = self.previous_position + delta * alpha
+        rotation = self.previous_rotation + (self.rotation - self.previous_rotation) * alpha
+        return pygame.draw.polygon(screen, "white", self.triangle(position, rotation), width=LINE_WIDTH)
+
+    def bounding_radius(self):
+        """Radius around `position` that encloses the whole triangle."""
+        return math.hypot(self.radius, self.radius / 1.5)
 
     def is_invulnerable(self):
         return self.invulnerable_timer > 0
 
+    def hull(self):
+        """The collision triangle for the current pose, as (x, y) tuples.
+
+        Only rebuilt when the position or rotation changed since the last
+        call, so every test within a step shares one triangle.
+        """
+        position = self.position
+        key = (position.x, position.y, self.rotation)
+        if key != self._hull_key:
+            self._hull_key = key
+            self._hull = tuple((vertex.x, vertex.y) for vertex in self.triangle())
+        return self._hull
+
     def collides_with(self, other):
         """Triangle-circle collision detection."""
-        triangle = self.triangle()
+        ox, oy = other.position
+        radius = other.radius
+
+        # Circles beyond the triangle's bounding circle can't touch it
+        dx = self.position.x - ox
+        dy = self.position.y - oy
+        reach = self.bounding_radius() + radius + _HULL_SLACK
+        if dx * dx + dy * dy > reach * reach:
+            return False
+
+        triangle = self.hull()
 
         # Check if any triangle vertex is inside the circle
-        for vertex in triangle:
-            if vertex.distance_to(other.position) <= other.radius:
+        for vx, vy in triangle:
+            dx = vx - ox
+            dy = vy - oy
+            if math.sqrt(dx * dx + dy * dy) <= radius:
                 return True
 
         # Check if any triangle edge intersects the circle
         for i in range(3):
-            start = triangle[i]
-            end = triangle[(i + 1) % 3]
-            if self._line_circle_collision(start, end, other.position, other.radius):
+            sx, sy = triangle[i]
+            ex, ey = triangle[(i + 1) % 3]
+            if _segment_hits_circle(sx, sy, ex, ey, ox, oy, radius):
                 return True
 
         return False
 
-    def _line_circle_collision(self, line_start, line_end, circle_center, circle_radius):
-        """Check if a line segment intersects a circle."""
-        # Vector from line start to end
-        line_vec = line_end - line_start
-        # Vector from line start to circle center
-        to_circle = circle_center - line_start
-
-        # Project circle center onto line
-        line_length_sq = line_vec.length_squared()
-        if line_length_sq == 0:
-            return to_circle.length() <= circle_radius
-
-        # Find closest point on line segment to circle center
-        t = max(0, min(1, to_circle.dot(line_vec) / line_length_sq))
-        closest_point = line_start + line_vec * t
-
-        # Check distance from closest point to circle center
-        return closest_point.distance_to(circle_center) <= circle_radius
+    def collides_with_circles(self, positions, radii):
+        """`collides_with` against many circles at once; returns a bool array.
+
+        Runs the same vertex and edge tests on NumPy arrays, after a
+        bounding-circle pass that drops everything out of reach.
+        """
+        centers = np.asarray(positions, dtype=float).reshape(-1, 2)
+        radii = np.asarray(radii, dtype=float)
+        dx = centers[:, 0] - self.position.x
+        dy = centers[:, 1] - self.position.y
+        reach = radii + (self.bounding_radius() + _HULL_SLACK)
+        hits = dx * dx + dy * dy <= reach * reach
+        if not hits.any():
+            return hits
+
+        near = hits.nonzero()[0]
+        cx = centers[near, 0]
+        cy = centers[near, 1]
+        radius = radii[near]
+        triangle = self.hull()
+        hit = np.zeros(len(near), dtype=bool)
+        for vx, vy in triangle:
+            dx = vx - cx
+            dy = vy - cy
+            hit |= np.sqrt(dx * dx + dy * dy) <= radius
+        for i in range(3):
+            sx, sy = triangle[i]
+            ex, ey = triangle[(i + 1) % 3]
+            lx = ex - sx
+            ly = ey - sy
+            tx = cx - sx
+            ty = cy - sy
+            length_sq = lx * lx + ly * ly
+            if length_sq == 0:
+                hit |= np.sqrt(tx * tx + ty * ty) <= radius
+                continue
+            t = np.clip((tx * lx + ty * ly) / length_sq, 0, 1)
+            dx = (sx + lx * t) - cx
+            dy = (sy + ly * t) - cy
+            hit |= np.sqrt(dx * dx + dy * dy) <= radius
+        hits[near] = hit
+        return hits
 
     def respawn(self, x, y):
         self.position = pygame.Vector2(x, y)
         self.velocity = pygame.Vector2(0, 0)
         self.rotation = 0
+        self.previous_position = pygame.Vector2(x, y)
+        self.previous_rotation = 0
         self.invulnerable_timer = PLAYER_INVULNERABILITY_SECONDS
     
     def rotate(self, dt):
         self.rotation += PLAYER_TURN_SPEED * dt
     
     def update(self, dt):
-        keys = pygame.key.get_pressed()
+        inputs = self.inputs
         self.shot_cooldown -= dt
 
         if self.invulnerable_timer > 0:
@@ -92,15 +200,15 @@ class Player(CircleShape):
         else:
             self.visible = True
 
-        if keys[pygame.K_a]:
+        if inputs & INPUT_LEFT:
             self.rotate(-dt)
-        if keys[pygame.K_d]:
+        if inputs & INPUT_RIGHT:
             self.rotate(dt)
-        if keys[pygame.K_w]:
+        if inputs & INPUT_THRUST:
             self.accelerate(dt)
-        if keys[pygame.K_s]:
+        if inputs & INPUT_REVERSE:
             self.accelerate(-dt)
-        if keys[pygame.K_SPACE]:
+        if inputs & INPUT_SHOOT:
             self.shoot()
 
         # Apply velocity and drag
@@ -119,8 +227,11 @@ class Player(CircleShape):
     def shoot(self):
         if self.shot_cooldown > 0:
             return
+        shot = Shot.create(self.position.x, self.position.y, SHOT_RADIUS)
+        if shot is None:
+            # Too many shots alive
+            return
         self.shot_cooldown = PLAYER_SHOOT_COOLDOWN_SECONDS
-        shot = Shot(self.position.x, self.position.y, SHOT_RADIUS)
         shot.velocity = pygame.Vector2(0, 1).rotate(self.rotation) * PLAYER_SHOOT_SPEED
         if sound_module.sounds:
             sound_module.sounds.play_shoot()
\ No newline at end of file
@@ -0,0 +1,59 @@
+class ObjectPool:
+    """Recycles dead sprites so steady-state play allocates none.
+
+    `acquire` hands out a recycled object (reinitialised through its
+    `reset` method) or builds a new one with `factory`. Killed objects come
+    back through `release`, but only become reusable after `collect`, so
+    anything still holding a reference during the current step sees an
+    unchanged object.
+    """
+
+    def __init__(self, factory, max_live=None):
+        self.factory = factory
+        self.max_live = max_live
+        self.free = []
+        self.pending = []
+        self.live = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.high_water = 0
+
+    def acquire(self, *args):
+        """Return a ready object, or None if `max_live` is reached."""
+        if self.max_live is not None and self.live >= self.max_live:
+            self.rejected += 1
+            return None
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.hits += 1
+        else:
+            obj = self.factory(*args)
+            self.misses += 1
+        obj.pool_owner = self
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return obj
+
+    def release(self, obj):
+        obj.pool_owner = None
+        self.live -= 1
+        self.pending.append(obj)
+
+    def collect(self):
+        """Make objects released since the last call reusable."""
+        if self.pending:
+            self.free.extend(self.pending)
+            self.pending.clear()
+
+    def stats(self):
+        return {
+            "live": self.live,
+            "free": len(self.free) + len(self.pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "high_water": self.high_water,
+        }
@@ -0,0 +1,139 @@
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+import pygame
+from constants import PROFILER_HISTORY_FRAMES, PROFILER_BUDGET_MS
+
+_NULL_SCOPE = nullcontext()
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        phases = self.profiler.current
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class Profiler:
+    """Per-phase frame timer with an in-game overlay.
+
+    Wrap each phase of the frame in `with profiler.phase("name"):`. While
+    disabled, `phase` returns a shared no-op context manager and nothing is
+    recorded. Timings of nested phases are also included in their parent.
+    """
+
+    def __init__(self, enabled=False, history=PROFILER_HISTORY_FRAMES):
+        self.enabled = enabled
+        self.overlay_visible = enabled
+        self.recent = deque(maxlen=history)
+        self.frames = []
+        self.current = {}
+        self.scopes = {}
+        self.frame_start = 0.0
+        self.frame_number = 0
+        self.overlay_lines = []
+        self.overlay_refresh = 0
+
+    def toggle(self):
+        """Flip recording and the overlay on or off together."""
+        self.enabled = not self.enabled
+        self.overlay_visible = self.enabled
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = _Scope(self, name)
+        return scope
+
+    def begin_frame(self):
+        self.frame_number += 1
+        if not self.enabled:
+            return
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start == 0.0:
+            return
+        record = {
+            "frame": self.frame_number,
+            "total_ms": (time.perf_counter() - self.frame_start) * 1000,
+        }
+        for name, seconds in self.current.items():
+            record[name] = seconds * 1000
+        self.recent.append(record)
+        self.frames.append(record)
+        self.frame_start = 0.0
+
+    def summary(self):
+        """Rolling mean and p99 (ms) of every phase over the recent history."""
+        names = {}
+        for record in self.recent:
+            for name, value in record.items():
+                if name != "frame":
+                    names.setdefault(name, []).append(value)
+        result = {}
+        for name, values in names.items():
+            values.sort()
+            result[name] = {
+                "mean": sum(values) / len(values),
+                "p99": values[min(len(values) - 1, int(len(values) * 0.99))],
+            }
+        return result
+
+    def draw(self, screen, font):
+        """Draw the overlay; returns the rects touched."""
+        if not self.overlay_visible:
+            return []
+        rects = []
+
+        # Re-render the numbers a few times per second, not every frame
+        self.overlay_refresh -= 1
+        if self.overlay_refresh <= 0:
+            self.overlay_refresh = 15
+            summary = self.summary()
+            ordered = sorted(summary.items(), key=lambda item: item[0] != "total_ms")
+            self.overlay_lines = [
+                font.render(f"{name[:-3] if name.endswith('_ms') else name:<10} "
+                            f"{stats['mean']:6.2f} avg {stats['p99']:6.2f} p99", True, "yellow")
+                for name, stats in ordered
+            ]
+
+        x, y = 10, 60
+        for line in self.overlay_lines:
+            rects.append(screen.blit(line, (x, y)))
+            y += line.get_height()
+
+        # Frame-time graph, one column per recent frame
+        graph_height = 60
+        top = y + 5
+        bottom = top + graph_height
+        budget_y = bottom - min(graph_height, int(PROFILER_BUDGET_MS * 2))
+        pygame.draw.line(screen, "red", (x, budget_y), (x + self.recent.maxlen, budget_y))
+        for i, record in enumerate(self.recent):
+            height = min(graph_height, int(record["total_ms"] * 2))
+            color = "yellow" if record["total_ms"] <= PROFILER_BUDGET_MS else "red"
+            pygame.draw.line(screen, color, (x + i, bottom), (x + i, bottom - height))
+        rects.append(pygame.Rect(x, top, self.recent.maxlen + 1, graph_height + 1))
+        return rects
+
+    def dump(self, path):
+        """Write every recorded frame as JSONL; returns False if nothing was recorded."""
+        if not self.frames:
+            return False
+        with open(path, "w") as f:
+            for record in self.frames:
+                f.write(json.dumps(record) + "\n")
+        return True
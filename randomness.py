@@ -0,0 +1,52 @@
+import random
+import secrets
+import numpy as np
+
+
+class RandomService:
+    """Seeded random streams shared by the whole game.
+
+    `gameplay` drives everything that changes the simulation (spawns,
+    splits, asteroid spin); `cosmetic` and `particles` drive what only
+    changes the picture (outline variants, explosion sparks). Keeping them
+    apart means drawing more or fewer effects never shifts a replay.
+    Callers must look the streams up on the service each time rather than
+    keep a reference, since `seed` and `use` replace them.
+    """
+
+    def __init__(self, seed=None):
+        self.gameplay = None
+        self.cosmetic = None
+        self.particles = None
+        self.current_seed = None
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Reseed every stream; a fresh seed is drawn when `seed` is None.
+
+        Returns the seed used, so a session can be recorded and replayed.
+        """
+        if seed is None:
+            seed = secrets.randbits(32)
+        self.current_seed = seed
+        # Fresh generators rather than reseeding in place, so reseeding
+        # never disturbs a service whose streams another one `use`s
+        self.gameplay = random.Random(seed)
+        self.cosmetic = random.Random(seed ^ 0x5DEECE66D)
+        self.particles = np.random.default_rng([seed, 1])
+        return seed
+
+    def use(self, other):
+        """Draw from `other`'s streams until the next `seed` or `use`.
+
+        Every World has a service of its own and points the shared one
+        (which the sprite modules import) at it in `World.bind`, so worlds
+        stepped in turn never draw from each other's streams.
+        """
+        self.gameplay = other.gameplay
+        self.cosmetic = other.cosmetic
+        self.particles = other.particles
+        self.current_seed = other.current_seed
+
+
+random_service = RandomService()
@@ -0,0 +1,98 @@
+import pygame
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+class DirtyRectRenderer:
+    """Presents only the parts of the screen that changed.
+
+    Dynamic frames erase last frame's rects, draw, and push the union of old
+    and new rects with `display.update`. Static screens (menu, pause) are
+    composed once and then left alone until something invalidates them.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.previous = []
+        self.current = []
+        self.kept = []  # Pushed this frame only, see `erase` and `add`
+        self.full_redraw = True
+        self.static_key = None
+        self.overlays = {}
+
+    def invalidate(self):
+        """Force the next frame to redraw and present the whole screen."""
+        self.full_redraw = True
+        self.static_key = None
+
+    def overlay(self, alpha):
+        """A cached full-screen translucent black surface."""
+        surface = self.overlays.get(alpha)
+        if surface is None:
+            surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            surface.fill("black")
+            surface.set_alpha(alpha)
+            self.overlays[alpha] = surface
+        return surface
+
+    def begin(self, full=False):
+        if full:
+            self.full_redraw = True
+        if self.full_redraw:
+            self.screen.fill("black")
+        else:
+            for rect in self.previous:
+                self.screen.fill("black", rect)
+        self.current = []
+
+    def erases(self, rects):
+        """Whether `begin` will black out part of `rects` this frame."""
+        previous = self.previous
+        return self.full_redraw or any(rect.collidelist(previous) != -1 for rect in rects)
+
+    def erase(self, rects):
+        """Clear rects drawn with `keep=True`, before drawing them again."""
+        for rect in rects:
+            self.screen.fill("black", rect)
+        self.kept.extend(rects)
+
+    def add(self, rects, keep=False):
+        """Record rect(s) returned by a draw call; None is ignored.
+
+        Kept rects are not erased next frame, so whatever was drawn there
+        stays on screen until it is erased explicitly (e.g. a HUD that is
+        not redrawn every frame).
+        """
+        if rects is None:
+            return
+        target = self.kept if keep else self.current
+        if isinstance(rects, pygame.Rect):
+            target.append(rects)
+        else:
+            target.extend(rects)
+
+    def present(self):
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.previous + self.kept + self.current)
+        self.previous = self.current
+        self.current = []
+        self.kept = []
+        self.static_key = None
+
+    def show_static(self, key, compose):
+        """Compose a frame that does not change once and keep showing it.
+
+        `compose(screen)` is only called again when `key` changes or the
+        renderer is invalidated.
+        """
+        if key == self.static_key:
+            return
+        self.screen.fill("black")
+        compose(self.screen)
+        pygame.display.flip()
+        self.static_key = key
+        self.previous = []
+        # Whatever comes next has to repaint over the composed frame
+        self.full_redraw = True
@@ -0,0 +1,187 @@
+import argparse
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from constants import REPLAY_CHECKPOINT_INTERVAL, RECORDINGS_DIR
+from headless import init_headless
+from profiler import Profiler
+from world import World
+
+_MAGIC = b"ASTREC01"
+# seed, step dt, tick count, checkpoint interval, checkpoint count
+_HEADER = struct.Struct("<8sQdIII")
+# tick, state hash
+_CHECKPOINT = struct.Struct("<I8s")
+
+
+class Recording:
+    """A game as its seed plus one input bitmask per simulation step.
+
+    `checkpoints` maps a tick number to the world's `state_hash()` right
+    after that many steps. On disk the inputs are zlib-compressed bytes,
+    so a held key costs next to nothing.
+    """
+
+    def __init__(self, seed, dt, inputs=None, checkpoints=None, checkpoint_interval=REPLAY_CHECKPOINT_INTERVAL):
+        self.seed = seed
+        self.dt = dt
+        self.inputs = inputs if inputs is not None else bytearray()
+        self.checkpoints = checkpoints if checkpoints is not None else {}
+        self.checkpoint_interval = checkpoint_interval
+
+    @property
+    def ticks(self):
+        return len(self.inputs)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.seed, self.dt, self.ticks,
+                                 self.checkpoint_interval, len(self.checkpoints)))
+            for tick, state_hash in sorted(self.checkpoints.items()):
+                f.write(_CHECKPOINT.pack(tick, state_hash))
+            f.write(zlib.compress(bytes(self.inputs), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, seed, dt, ticks, interval, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        offset = _HEADER.size
+        checkpoints = {}
+        for _ in range(count):
+            tick, state_hash = _CHECKPOINT.unpack_from(data, offset)
+            checkpoints[tick] = state_hash
+            offset += _CHECKPOINT.size
+        inputs = bytearray(zlib.decompress(data[offset:]))
+        if len(inputs) != ticks:
+            raise ValueError(f"{path} is truncated: {len(inputs)} of {ticks} ticks")
+        return cls(seed, dt, inputs, checkpoints, interval)
+
+
+class Recorder:
+    """Captures the game being played, one `record` call per world step."""
+
+    def __init__(self, directory=RECORDINGS_DIR, checkpoint_interval=REPLAY_CHECKPOINT_INTERVAL):
+        self.directory = directory
+        self.checkpoint_interval = checkpoint_interval
+        self.recording = None
+
+    @property
+    def active(self):
+        return self.recording is not None
+
+    def start(self, world, dt):
+        """Begin a recording; call right after `world.reset()`."""
+        self.recording = Recording(world.seed, dt, checkpoint_interval=self.checkpoint_interval)
+
+    def record(self, world, inputs):
+        """Log the inputs of the step the world just took."""
+        recording = self.recording
+        if recording is None:
+            return
+        recording.inputs.append(inputs)
+        if recording.ticks % self.checkpoint_interval == 0 or world.game_over:
+            recording.checkpoints[recording.ticks] = world.state_hash()
+
+    def stop(self, world):
+        """Finish the recording and save it; returns the path, or None."""
+        recording, self.recording = self.recording, None
+        if recording is None or recording.ticks == 0:
+            return None
+        recording.checkpoints[recording.ticks] = world.state_hash()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"session-{stamp}-{recording.seed}.asrec")
+        recording.save(path)
+        return path
+
+
+def replay(recording, profiler=None, world=None):
+    """Re-run a recording as fast as possible and check every checkpoint.
+
+    Pass `world` to replay on a World that already played other games, the
+    way the game reuses one World for a whole session; a replay has to
+    match either way.
+
+    Returns a dict with throughput, the final state and the first tick
+    whose state hash differed from the recording (None if all matched).
+    """
+    if world is None:
+        world = World(profiler=profiler)
+    else:
+        world.profiler = profiler if profiler is not None else Profiler()
+    world.reset(recording.seed)
+    checkpoints = recording.checkpoints
+    dt = recording.dt
+    step = world.step
+    mismatch = None
+    checked = 0
+
+    start = time.perf_counter()
+    for tick, inputs in enumerate(recording.inputs, 1):
+        if profiler:
+            profiler.begin_frame()
+            step(dt, inputs)
+            profiler.end_frame()
+        else:
+            step(dt, inputs)
+        expected = checkpoints.get(tick)
+        if expected is not None:
+            checked += 1
+            if world.state_hash() != expected:
+                mismatch = tick
+                break
+    elapsed = time.perf_counter() - start
+
+    steps = mismatch or recording.ticks
+    result = {
+        "ticks": recording.ticks,
+        "steps": steps,
+        "seconds": elapsed,
+        "steps_per_second": steps / elapsed if elapsed > 0 else float("inf"),
+        "game_seconds": steps * dt,
+        "checkpoints": checked,
+        "mismatch": mismatch,
+        "wave": world.wave,
+        "score": world.score,
+        "lives": world.lives,
+    }
+    world.clear()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded games without a display and verify them.")
+    parser.add_argument("recordings", nargs="+", help="Recording files (.asrec)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Also report per-phase step timings")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Replay each recording on a new World instead of reusing one for all of them")
+    args = parser.parse_args()
+
+    init_headless()
+    # Reused like the game reuses its World, so leftovers from one game
+    # that leak into the next show up as a desync
+    world = None if args.fresh else World()
+    failed = False
+    for path in args.recordings:
+        recording = Recording.load(path)
+        profiler = Profiler(enabled=True, history=recording.ticks or 1) if args.profile else None
+        result = replay(recording, profiler, world)
+        status = "OK" if result["mismatch"] is None else f"DESYNC at tick {result['mismatch']}"
+        print(f"{path}: {status}  {result['game_seconds']:.0f}s of play in {result['seconds']:.3f}s "
+              f"({result['steps_per_second']:.0f} steps/s, {result['checkpoints']} checkpoints)  "
+              f"Wave: {result['wave']}  Score: {result['score']}")
+        if profiler:
+            for name, stats in profiler.summary().items():
+                print(f"  {name:<10} {stats['mean']:.3f}ms avg  {stats['p99']:.3f}ms p99")
+        failed = failed or result["mismatch"] is not None
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
-from circleshape import CircleShape
+from entitystore import StoredCircleShape
 import pygame
-from constants import LINE_WIDTH
+from constants import LINE_WIDTH, SHOT_LIFETIME_SECONDS
 
-class Shot(CircleShape):
+class Shot(StoredCircleShape):
     def __init__(self, x, y, radius):
         super().__init__(x, y, radius)
+        self.lifetime = SHOT_LIFETIME_SECONDS
 
-    def draw(self, screen):
-        pygame.draw.circle(screen, "white", self.position, self.radius, width=LINE_WIDTH)
+    def reset(self, x, y, radius):
+        super().reset(x, y, radius)
+        self.lifetime = SHOT_LIFETIME_SECONDS
 
-    def update(self, dt):
-        self.position += self.velocity * dt
-        self.wrap_position()
\ No newline at end of file
+    def draw(self, screen, alpha=1.0):
+        position = self.entity_store.render_positions[self.slot].tolist()
+        return pygame.draw.circle(screen, "white", position, self.radius, width=LINE_WIDTH)
@@ -1,128 +1,172 @@
 import pygame
-import array
-import math
+import hashlib
+import json
+import os
+import numpy as np
+from voices import VoiceManager
 
 SAMPLE_RATE = 22050
-
-
-def generate_sound(frequency, duration, volume=0.3, wave_type="square"):
-    """Generate a simple sound wave."""
+SYNTH_VERSION = 1  # Bump when synthesis output changes to invalidate the cache
+SOUND_CACHE_DIR = os.environ.get(
+    "ASTEROIDS_SOUND_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "pygame-asteroid", "sounds"),
+)
+
+# Effect name -> synthesis parameters, see `synthesize` for the meaning.
+# Adding an effect here costs one synthesis on the first run only.
+EFFECTS = {
+    # Low rumbling explosion: descending sine mixed with noise
+    "explosion": {
+        "duration": 0.3,
+        "volume": 0.4,
+        "layers": [["sine", 0.6, 80, 40], ["noise", 0.4]],
+    },
+    # High pitched laser pew: fast descending sine
+    "shoot": {
+        "duration": 0.1,
+        "volume": 0.25,
+        "layers": [["sine", 1.0, 800, 200]],
+    },
+    # Harsh buzz for player damage: pulsing square with a little noise
+    "player_hit": {
+        "duration": 0.4,
+        "volume": 0.35,
+        "layers": [["square", 0.7, 120, 120], ["noise", 0.15]],
+        "pulses": 4,
+    },
+}
+
+
+def synthesize(duration, layers, volume=0.3, pulses=0, seed=0):
+    """Render a mono effect as int16 samples.
+
+    Each layer is `[wave_type, amplitude, start_freq, end_freq]` for "sine"
+    and "square" (the frequency sweeps linearly across the effect) or
+    `["noise", amplitude]`. Layers are summed, then shaped by a linear fade
+    out, optionally multiplied by `pulses` half-sine pulses per effect.
+    """
     num_samples = int(SAMPLE_RATE * duration)
-    samples = array.array('h')
-
-    for i in range(num_samples):
-        t = i / SAMPLE_RATE
-        
+    index = np.arange(num_samples)
+    t = index / num_samples
+    seconds = index / SAMPLE_RATE
+    rng = np.random.default_rng(seed)
+
+    value = np.zeros(num_samples)
+    for layer in layers:
+        wave_type, amplitude = layer[0], layer[1]
+        if wave_type == "noise":
+            value += rng.uniform(-1, 1, num_samples) * amplitude
+            continue
+        start_freq, end_freq = layer[2], layer[3]
+        freq = start_freq + (end_freq - start_freq) * t
+        wave = np.sin(2 * np.pi * freq * seconds)
         if wave_type == "square":
-            value = 1 if math.sin(2 * math.pi * frequency * t) > 0 else -1
-        elif wave_type == "sine":
-            value = math.sin(2 * math.pi * frequency * t)
-        elif wave_type == "noise":
-            import random
-            value = random.uniform(-1, 1)
-        else:
-            value = math.sin(2 * math.pi * frequency * t)
+            wave = np.where(wave > 0, 1.0, -1.0)
+        value += wave * amplitude
 
-        # Apply envelope (fade out)
-        envelope = 1 - (i / num_samples)
-        value *= envelope * volume
+    envelope = 1 - t
+    if pulses:
+        envelope *= np.abs(np.sin(np.pi * t * pulses))
+    value *= envelope * volume
 
-        samples.append(int(value * 32767))
+    return (value * 32767).astype(np.int16)
 
-    sound = pygame.mixer.Sound(buffer=samples)
-    return sound
 
+def _cache_path(params):
+    key = json.dumps([SYNTH_VERSION, SAMPLE_RATE, params], sort_keys=True)
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(SOUND_CACHE_DIR, f"{digest}.pcm")
 
-def generate_explosion_sound():
-    """Low rumbling explosion sound."""
-    num_samples = int(SAMPLE_RATE * 0.3)
-    samples = array.array('h')
-    import random
 
-    for i in range(num_samples):
-        t = i / num_samples
-        # Mix of low frequency sine and noise
-        freq = 80 * (1 - t * 0.5)  # Descending frequency
-        sine = math.sin(2 * math.pi * freq * (i / SAMPLE_RATE))
-        noise = random.uniform(-1, 1)
-        value = sine * 0.6 + noise * 0.4
-        
-        # Envelope
-        envelope = 1 - t
-        value *= envelope * 0.4
+def render_cached(params):
+    """Return samples for `params`, synthesizing only on a cache miss."""
+    path = _cache_path(params)
+    try:
+        return np.fromfile(path, dtype=np.int16)
+    except OSError:
+        pass
 
-        samples.append(int(value * 32767))
+    samples = synthesize(**params)
+    try:
+        os.makedirs(SOUND_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        samples.tofile(tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        # A read-only or missing cache only costs us the warm start
+        pass
+    return samples
 
-    return pygame.mixer.Sound(buffer=samples)
 
+def make_sound(params):
+    return pygame.mixer.Sound(buffer=render_cached(params).tobytes())
 
-def generate_shoot_sound():
-    """High pitched laser pew sound."""
-    num_samples = int(SAMPLE_RATE * 0.1)
-    samples = array.array('h')
 
-    for i in range(num_samples):
-        t = i / num_samples
-        # Descending frequency for pew effect
-        freq = 800 - 600 * t
-        value = math.sin(2 * math.pi * freq * (i / SAMPLE_RATE))
-        
-        # Quick envelope
-        envelope = 1 - t
-        value *= envelope * 0.25
+def generate_sound(frequency, duration, volume=0.3, wave_type="square"):
+    """Generate a simple sound wave."""
+    if wave_type not in ("square", "sine", "noise"):
+        wave_type = "sine"
+    return make_sound({
+        "duration": duration,
+        "volume": volume,
+        "layers": [[wave_type, 1.0, frequency, frequency]],
+    })
 
-        samples.append(int(value * 32767))
 
-    return pygame.mixer.Sound(buffer=samples)
+def generate_explosion_sound():
+    """Low rumbling explosion sound."""
+    return make_sound(EFFECTS["explosion"])
+
+
+def generate_shoot_sound():
+    """High pitched laser pew sound."""
+    return make_sound(EFFECTS["shoot"])
 
 
 def generate_player_hit_sound():
     """Harsh buzz for player damage."""
-    num_samples = int(SAMPLE_RATE * 0.4)
-    samples = array.array('h')
-    import random
+    return make_sound(EFFECTS["player_hit"])
 
-    for i in range(num_samples):
-        t = i / num_samples
-        # Distorted low frequency
-        freq = 120
-        square = 1 if math.sin(2 * math.pi * freq * (i / SAMPLE_RATE)) > 0 else -1
-        noise = random.uniform(-0.5, 0.5)
-        value = square * 0.7 + noise * 0.3
-        
-        # Pulsing envelope
-        pulse = abs(math.sin(math.pi * t * 4))
-        envelope = (1 - t) * pulse
-        value *= envelope * 0.35
 
-        samples.append(int(value * 32767))
-
-    return pygame.mixer.Sound(buffer=samples)
+def load_sound_bank():
+    """Samples of every effect; NumPy only, so safe to run off the main thread."""
+    return {name: render_cached(params) for name, params in EFFECTS.items()}
 
 
 class SoundManager:
-    def __init__(self):
+    def __init__(self, bank=None):
         pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=1, buffer=512)
-        self.shoot = generate_shoot_sound()
-        self.explosion = generate_explosion_sound()
-        self.player_hit = generate_player_hit_sound()
+        if bank is None:
+            bank = load_sound_bank()
+        self.effects = {name: pygame.mixer.Sound(buffer=samples.tobytes()) for name, samples in bank.items()}
+        self.shoot = self.effects["shoot"]
+        self.explosion = self.effects["explosion"]
+        self.player_hit = self.effects["player_hit"]
+        self.voices = VoiceManager(self.effects)
+
+    def play(self, name):
+        """Queue an effect; it is played by the next `flush`."""
+        self.voices.request(name)
+
+    def flush(self):
+        """Play everything queued this frame; call once per frame."""
+        self.voices.flush()
 
     def play_shoot(self):
-        self.shoot.play()
+        self.play("shoot")
 
     def play_explosion(self):
-        self.explosion.play()
+        self.play("explosion")
 
     def play_player_hit(self):
-        self.player_hit.play()
+        self.play("player_hit")
 
 
 # Global sound manager instance
 sounds = None
 
 
-def init_sounds():
+def init_sounds(bank=None):
     global sounds
-    sounds = SoundManager()
+    sounds = SoundManager(bank)
     return sounds
-
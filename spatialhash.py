@@ -0,0 +1,86 @@
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, SPATIAL_HASH_CELL_SIZE
+
+
+class SpatialHash:
+    """Uniform grid broad-phase for circle shapes.
+
+    Each object is inserted into every cell its bounding box touches, so two
+    circles that overlap always share at least one cell. Cell coordinates wrap
+    around the screen edges to match `CircleShape.wrap_position`, which means
+    objects sitting on opposite edges land in neighbouring cells and still
+    reach the narrow phase.
+    """
+
+    def __init__(self, cell_size=SPATIAL_HASH_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cols = max(1, -(-SCREEN_WIDTH // cell_size))
+        self.rows = max(1, -(-SCREEN_HEIGHT // cell_size))
+        self.cells = {}
+        self.objects = []
+        self.positions = []
+        self.radii = []
+
+    def clear(self):
+        self.cells.clear()
+        self.objects = []
+        self.positions = []
+        self.radii = []
+
+    def _cell_range(self, x, y, radius):
+        size = self.cell_size
+        min_col = int((x - radius) // size)
+        max_col = int((x + radius) // size)
+        min_row = int((y - radius) // size)
+        max_row = int((y + radius) // size)
+        # A box wider than the grid touches every column/row anyway
+        if max_col - min_col >= self.cols:
+            min_col, max_col = 0, self.cols - 1
+        if max_row - min_row >= self.rows:
+            min_row, max_row = 0, self.rows - 1
+        for col in range(min_col, max_col + 1):
+            for row in range(min_row, max_row + 1):
+                yield (col % self.cols, row % self.rows)
+
+    def build(self, objects, positions=None, radii=None):
+        """Rebuild the grid from scratch, remembering iteration order.
+
+        `positions` and `radii` may be passed in when the caller already has
+        them as plain numbers (e.g. gathered from an EntityStore); otherwise
+        they are read from each object.
+        """
+        self.cells.clear()
+        self.objects = list(objects)
+        if positions is None:
+            positions = [tuple(obj.position) for obj in self.objects]
+        if radii is None:
+            radii = [obj.radius for obj in self.objects]
+        self.positions = positions
+        self.radii = radii
+
+        cells = self.cells
+        for index, ((x, y), radius) in enumerate(zip(positions, radii)):
+            for key in self._cell_range(x, y, radius):
+                bucket = cells.get(key)
+                if bucket is None:
+                    cells[key] = [index]
+                else:
+                    bucket.append(index)
+
+    def query_indices(self, x, y, radius):
+        """Indices of objects whose cells overlap the circle's bounding box.
+
+        Indices come back sorted, i.e. in the order the objects were passed
+        to `build`, so callers that stop at the first hit behave the same as
+        a plain linear scan.
+        """
+        found = set()
+        cells = self.cells
+        for key in self._cell_range(x, y, radius):
+            bucket = cells.get(key)
+            if bucket:
+                found.update(bucket)
+        return sorted(found)
+
+    def query(self, x, y, radius):
+        objects = self.objects
+        return [objects[index] for index in self.query_indices(x, y, radius)]
@@ -0,0 +1,152 @@
+import json
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+# main.py imports this module before anything else
+_PROCESS_START = time.perf_counter()
+
+
+class Startup:
+    """Brings the game up in stages and reports how long each one took.
+
+    Stages the first frame needs run on the main thread inside `measure`.
+    Pure Python or NumPy work goes to `submit`, which runs it on a
+    background thread; a `then` callback that must touch pygame (e.g.
+    opening the mixer) runs later on the main thread, from `poll` or
+    `finish`. Other pygame work (fonts: SDL_ttf is not thread-safe) goes
+    to `defer`, which runs it on the main thread one stage per `poll`,
+    between frames. Times are milliseconds, with the first frame and
+    "ready" counted from the moment this module was imported. Call
+    `frame_presented` after every frame: once everything is in, and only
+    if a `report_path` was given, it prints the summary and appends the
+    report to that file.
+    """
+
+    def __init__(self, report_path=None):
+        self.report_path = report_path
+        self.reported = False
+        self.started = _PROCESS_START
+        self.stages = {"imports": self._since(_PROCESS_START)}
+        self.first_frame_ms = None
+        self.ready_ms = None
+        self.pending = []  # (future, then) of background stages
+        self.deferred = deque()  # (name, fn, future) of main-thread stages
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+
+    @staticmethod
+    def _since(start):
+        return (time.perf_counter() - start) * 1000
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + self._since(start)
+
+    def submit(self, name, fn, then=None):
+        """Run `fn` in the background; returns its Future.
+
+        `then` is an optional `(name, callback)` called with the result on
+        the main thread once it's ready, and timed as its own stage.
+        """
+        def timed():
+            start = time.perf_counter()
+            result = fn()
+            self.stages[name] = self._since(start)
+            return result
+
+        future = self.executor.submit(timed)
+        self.pending.append((future, then))
+        return future
+
+    def defer(self, name, fn):
+        """Run `fn` on the main thread later, one deferred stage per `poll`; returns a Future."""
+        future = Future()
+        self.deferred.append((name, fn, future))
+        return future
+
+    def _run_deferred(self):
+        name, fn, future = self.deferred.popleft()
+        try:
+            with self.measure(name):
+                result = fn()
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def frame_presented(self):
+        if self.reported:
+            return
+        if self.first_frame_ms is None:
+            self.first_frame_ms = self._since(self.started)
+        self.poll()
+        if self.done:
+            self.reported = True
+            if self.report_path is not None:
+                print(self.summary())
+                self.dump(self.report_path)
+
+    @property
+    def done(self):
+        return self.ready_ms is not None
+
+    def poll(self):
+        """Finish whatever background work is ready without blocking."""
+        if self.done:
+            return
+        self._complete(wait=False)
+
+    def finish(self):
+        """Block until every stage is done."""
+        if self.done:
+            return
+        self._complete(wait=True)
+
+    def _complete(self, wait):
+        still_pending = []
+        for future, then in self.pending:
+            if not wait and not future.done():
+                still_pending.append((future, then))
+                continue
+            result = future.result()
+            if then is not None:
+                name, callback = then
+                with self.measure(name):
+                    callback(result)
+        self.pending = still_pending
+        if self.deferred:
+            self._run_deferred()
+        while wait and self.deferred:
+            self._run_deferred()
+        if not self.pending and not self.deferred:
+            self.ready_ms = self._since(self.started)
+            self.executor.shutdown(wait=False)
+
+    def report(self):
+        return {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "stages_ms": {name: round(ms, 2) for name, ms in self.stages.items()},
+            "first_frame_ms": None if self.first_frame_ms is None else round(self.first_frame_ms, 2),
+            "ready_ms": None if self.ready_ms is None else round(self.ready_ms, 2),
+        }
+
+    def summary(self):
+        stages = ", ".join(f"{name} {ms:.1f}ms" for name, ms in self.stages.items())
+        first_frame = "-" if self.first_frame_ms is None else f"{self.first_frame_ms:.0f}ms"
+        ready = "-" if self.ready_ms is None else f"{self.ready_ms:.0f}ms"
+        return f"Startup: first frame at {first_frame}, ready at {ready} ({stages})"
+
+    def dump(self, path):
+        """Append the report as one JSON line, so launches can be compared over time."""
+        try:
+            with open(path, "a") as f:
+                f.write(json.dumps(self.report()) + "\n")
+        except OSError:
+            return False
+        return True
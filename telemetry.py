@@ -0,0 +1,408 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import numpy as np
+
+# File layout
+#   header   magic, version
+#   records  tag (u8) + body length (u32) + body, in write order
+#   footer   an index record, then the trailer pointing at it
+#
+# A file cut short (e.g. by a crash) has no footer; the reader then
+# rebuilds the tables by scanning the records once.
+MAGIC = b"ASTTLM01"
+VERSION = 1
+_HEADER = struct.Struct("<8sI")
+_RECORD = struct.Struct("<BI")
+_TRAILER = struct.Struct("<Q8s")
+_TRAILER_MAGIC = b"ASTTLIDX"
+
+TAG_STRING = 0  # body: id (u16) + UTF-8 text
+TAG_STATE = 1  # body: _STATE, then per entry _ENTRY + sample rows of SPRITE_DTYPE
+TAG_EVENT = 2  # body: _EVENT, then any extra fields as JSON
+TAG_INDEX = 3  # body: _INDEX, string table, state index, event index
+
+# frame, clock (ms since midnight), elapsed_s, screen width/height (-1 if unknown), entries
+_STATE = struct.Struct("<IIIhhH")
+# name id, kind (0 = group, 1 = single sprite), sprite count, sample rows
+_ENTRY = struct.Struct("<HBIH")
+# frame, clock (ms since midnight), elapsed_s, type id
+_EVENT = struct.Struct("<IIIH")
+# string count, state count, event count
+_INDEX = struct.Struct("<HII")
+
+KIND_GROUP = 0
+KIND_SPRITE = 1
+
+# Which optional fields a sprite row carries
+HAS_POS = 1
+HAS_VEL = 2
+HAS_RAD = 4
+HAS_ROT = 8
+RAD_IS_INT = 16
+
+SPRITE_DTYPE = np.dtype([
+    ("type", "<u2"), ("flags", "u1"),
+    ("x", "<f4"), ("y", "<f4"), ("vx", "<f4"), ("vy", "<f4"),
+    ("rad", "<f4"), ("rot", "<f4"),
+])
+INDEX_DTYPE = np.dtype([("frame", "<u4"), ("offset", "<u8")])
+
+
+def parse_clock(timestamp):
+    """"HH:MM:SS.mmm" -> milliseconds since midnight."""
+    hms, _, millis = timestamp.partition(".")
+    hours, minutes, seconds = (int(part) for part in hms.split(":"))
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + int(millis or 0)
+
+
+def format_clock(clock_ms):
+    seconds, millis = divmod(clock_ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+class TelemetryWriter:
+    """Encodes logger records (the JSONL schema) into the binary format.
+
+    Strings such as group names, sprite types and event types are interned:
+    each is written once and then referred to by a 16-bit id. Call `close`
+    to append the index that makes random access cheap.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.strings = {}
+        self.state_index = []
+        self.event_index = []
+        self.offset = 0
+        self._write(_HEADER.pack(MAGIC, VERSION))
+
+    def _write(self, data):
+        self.f.write(data)
+        self.offset += len(data)
+
+    def _record(self, tag, body):
+        self._write(_RECORD.pack(tag, len(body)))
+        self._write(body)
+
+    def _intern(self, text):
+        string_id = self.strings.get(text)
+        if string_id is None:
+            string_id = self.strings[text] = len(self.strings)
+            self._record(TAG_STRING, struct.pack("<H", string_id) + text.encode())
+        return string_id
+
+    def _sprite_row(self, info):
+        flags = 0
+        x = y = vx = vy = rad = rot = 0.0
+        if "pos" in info:
+            flags |= HAS_POS
+            x, y = info["pos"]
+        if "vel" in info:
+            flags |= HAS_VEL
+            vx, vy = info["vel"]
+        if "rad" in info:
+            flags |= HAS_RAD
+            rad = info["rad"]
+            if isinstance(rad, int):
+                flags |= RAD_IS_INT
+        if "rot" in info:
+            flags |= HAS_ROT
+            rot = info["rot"]
+        return (self._intern(info["type"]), flags, x, y, vx, vy, rad, rot)
+
+    def write_state(self, entry):
+        entries = []
+        for name, value in entry.items():
+            if name in ("timestamp", "elapsed_s", "frame", "screen_size"):
+                continue
+            if "sprites" in value:
+                rows = [self._sprite_row(info) for info in value["sprites"]]
+                entries.append((self._intern(name), KIND_GROUP, value["count"], rows))
+            else:
+                entries.append((self._intern(name), KIND_SPRITE, 1, [self._sprite_row(value)]))
+
+        width, height = entry.get("screen_size") or (-1, -1)
+        parts = [_STATE.pack(entry["frame"], parse_clock(entry["timestamp"]), entry["elapsed_s"],
+                             width, height, len(entries))]
+        for name_id, kind, count, rows in entries:
+            parts.append(_ENTRY.pack(name_id, kind, count, len(rows)))
+            parts.append(np.array(rows, dtype=SPRITE_DTYPE).tobytes())
+        self.state_index.append((entry["frame"], self.offset))
+        self._record(TAG_STATE, b"".join(parts))
+
+    def write_event(self, event):
+        type_id = self._intern(event["type"])
+        extra = {key: value for key, value in event.items()
+                 if key not in ("timestamp", "elapsed_s", "frame", "type")}
+        body = _EVENT.pack(event["frame"], parse_clock(event["timestamp"]), event["elapsed_s"], type_id)
+        if extra:
+            body += json.dumps(extra).encode()
+        self.event_index.append((event["frame"], self.offset))
+        self._record(TAG_EVENT, body)
+
+    def close(self):
+        """Append the string table and frame indexes, then the trailer."""
+        index_offset = self.offset
+        parts = [_INDEX.pack(len(self.strings), len(self.state_index), len(self.event_index))]
+        for text in self.strings:
+            encoded = text.encode()
+            parts.append(struct.pack("<H", len(encoded)) + encoded)
+        parts.append(np.array(self.state_index, dtype=INDEX_DTYPE).tobytes())
+        parts.append(np.array(self.event_index, dtype=INDEX_DTYPE).tobytes())
+        self._record(TAG_INDEX, b"".join(parts))
+        self._write(_TRAILER.pack(index_offset, _TRAILER_MAGIC))
+        self.f.flush()
+
+
+class TelemetryReader:
+    """Random access to a telemetry file through a memory map.
+
+    Opening reads only the footer. `state(frame)` decodes a single
+    snapshot, `sprites(frame, name)` returns a zero-copy NumPy view of one
+    group's sample rows (valid while the reader is open), and
+    `events(start, stop)` walks just the events in that frame range.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = _HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a telemetry file")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported version {version}")
+        if not self._load_index():
+            self._scan()
+        self.frames = self.state_index["frame"]
+        self.event_frames = self.event_index["frame"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.state_index)
+
+    def close(self):
+        try:
+            self.data.close()
+        except BufferError:
+            pass  # Arrays from `sprites` still point into it; it closes once they're gone
+        self.file.close()
+
+    def _load_index(self):
+        data = self.data
+        if len(data) < _HEADER.size + _TRAILER.size:
+            return False
+        index_offset, magic = _TRAILER.unpack_from(data, len(data) - _TRAILER.size)
+        if magic != _TRAILER_MAGIC:
+            return False
+        tag, _ = _RECORD.unpack_from(data, index_offset)
+        if tag != TAG_INDEX:
+            return False
+        offset = index_offset + _RECORD.size
+        string_count, state_count, event_count = _INDEX.unpack_from(data, offset)
+        offset += _INDEX.size
+        self.strings = []
+        for _ in range(string_count):
+            (length,) = struct.unpack_from("<H", data, offset)
+            offset += 2
+            self.strings.append(data[offset:offset + length].decode())
+            offset += length
+        # Copied out so the index outlives the map; it's a small fraction of the file
+        self.state_index = np.frombuffer(data, INDEX_DTYPE, state_count, offset).copy()
+        offset += state_count * INDEX_DTYPE.itemsize
+        self.event_index = np.frombuffer(data, INDEX_DTYPE, event_count, offset).copy()
+        return True
+
+    def _scan(self):
+        """Rebuild the string table and indexes from the records themselves."""
+        data = self.data
+        strings = {}
+        states = []
+        events = []
+        offset = _HEADER.size
+        end = len(data)
+        while offset + _RECORD.size <= end:
+            tag, length = _RECORD.unpack_from(data, offset)
+            body = offset + _RECORD.size
+            if body + length > end:
+                break  # Truncated last record
+            if tag == TAG_STRING:
+                (string_id,) = struct.unpack_from("<H", data, body)
+                strings[string_id] = data[body + 2:body + length].decode()
+            elif tag == TAG_STATE:
+                states.append((struct.unpack_from("<I", data, body)[0], offset))
+            elif tag == TAG_EVENT:
+                events.append((struct.unpack_from("<I", data, body)[0], offset))
+            elif tag == TAG_INDEX:
+                break
+            offset = body + length
+        self.strings = [strings[i] for i in range(len(strings))]
+        self.state_index = np.array(states, dtype=INDEX_DTYPE)
+        self.event_index = np.array(events, dtype=INDEX_DTYPE)
+
+    def _state_offset(self, frame):
+        i = int(np.searchsorted(self.frames, frame))
+        if i == len(self.frames) or self.frames[i] != frame:
+            raise KeyError(frame)
+        return int(self.state_index["offset"][i])
+
+    def _entries(self, offset):
+        """Yield (name, kind, count, rows) for the state record at `offset`."""
+        data = self.data
+        position = offset + _RECORD.size + _STATE.size
+        *_, entry_count = _STATE.unpack_from(data, offset + _RECORD.size)
+        for _ in range(entry_count):
+            name_id, kind, count, row_count = _ENTRY.unpack_from(data, position)
+            position += _ENTRY.size
+            rows = np.frombuffer(data, SPRITE_DTYPE, row_count, position)
+            position += row_count * SPRITE_DTYPE.itemsize
+            yield self.strings[name_id], kind, count, rows
+
+    def sprites(self, frame, name):
+        """Sample rows (SPRITE_DTYPE) of entry `name` in the snapshot at `frame`."""
+        for entry_name, _, _, rows in self._entries(self._state_offset(frame)):
+            if entry_name == name:
+                return rows
+        raise KeyError(name)
+
+    def _sprite_info(self, row):
+        flags = int(row["flags"])
+        info = {"type": self.strings[int(row["type"])]}
+        if flags & HAS_POS:
+            info["pos"] = [round(float(row["x"]), 2), round(float(row["y"]), 2)]
+        if flags & HAS_VEL:
+            info["vel"] = [round(float(row["vx"]), 2), round(float(row["vy"]), 2)]
+        if flags & HAS_RAD:
+            rad = float(row["rad"])
+            info["rad"] = int(rad) if flags & RAD_IS_INT else rad
+        if flags & HAS_ROT:
+            info["rot"] = round(float(row["rot"]), 2)
+        return info
+
+    def _decode_state(self, offset):
+        frame, clock_ms, elapsed_s, width, height, _ = _STATE.unpack_from(self.data, offset + _RECORD.size)
+        entry = {
+            "timestamp": format_clock(clock_ms),
+            "elapsed_s": elapsed_s,
+            "frame": frame,
+            "screen_size": [width, height] if width >= 0 else [],
+        }
+        for name, kind, count, rows in self._entries(offset):
+            if kind == KIND_SPRITE:
+                entry[name] = self._sprite_info(rows[0])
+            else:
+                entry[name] = {"count": count, "sprites": [self._sprite_info(row) for row in rows]}
+        return entry
+
+    def state(self, frame):
+        """The snapshot logged at `frame`, in the JSONL schema."""
+        return self._decode_state(self._state_offset(frame))
+
+    def states(self):
+        for offset in self.state_index["offset"].tolist():
+            yield self._decode_state(offset)
+
+    def events(self, start=None, stop=None):
+        """Events with start <= frame < stop, in the JSONL schema."""
+        lo = 0 if start is None else int(np.searchsorted(self.event_frames, start))
+        hi = len(self.event_frames) if stop is None else int(np.searchsorted(self.event_frames, stop))
+        data = self.data
+        for offset in self.event_index["offset"][lo:hi].tolist():
+            _, length = _RECORD.unpack_from(data, offset)
+            body = offset + _RECORD.size
+            frame, clock_ms, elapsed_s, type_id = _EVENT.unpack_from(data, body)
+            event = {
+                "timestamp": format_clock(clock_ms),
+                "elapsed_s": elapsed_s,
+                "frame": frame,
+                "type": self.strings[type_id],
+            }
+            if length > _EVENT.size:
+                event.update(json.loads(data[body + _EVENT.size:body + length]))
+            yield event
+
+
+def jsonl_to_binary(output, state_path=None, events_path=None):
+    """Convert game_state.jsonl and/or game_events.jsonl into one telemetry file.
+
+    States and events are interleaved by frame, states first.
+    """
+    records = []
+    for path, kind in ((state_path, TAG_STATE), (events_path, TAG_EVENT)):
+        if path is None:
+            continue
+        with open(path) as f:
+            for order, line in enumerate(f):
+                if line.strip():
+                    record = json.loads(line)
+                    records.append((record["frame"], kind, order, record))
+    records.sort(key=lambda item: item[:3])
+
+    with open(output, "wb") as f:
+        writer = TelemetryWriter(f)
+        for _, kind, _, record in records:
+            if kind == TAG_STATE:
+                writer.write_state(record)
+            else:
+                writer.write_event(record)
+        writer.close()
+    return len(records)
+
+
+def binary_to_jsonl(path, state_path=None, events_path=None):
+    """Write a telemetry file back out as the logger's JSONL files."""
+    with TelemetryReader(path) as reader:
+        if state_path is not None:
+            with open(state_path, "w") as f:
+                for entry in reader.states():
+                    f.write(json.dumps(entry) + "\n")
+        if events_path is not None:
+            with open(events_path, "w") as f:
+                for event in reader.events():
+                    f.write(json.dumps(event) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between JSONL game logs and binary telemetry.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="JSONL logs -> telemetry file")
+    pack.add_argument("output")
+    pack.add_argument("--state", default="game_state.jsonl")
+    pack.add_argument("--events", default="game_events.jsonl")
+    unpack = commands.add_parser("unpack", help="Telemetry file -> JSONL logs")
+    unpack.add_argument("input")
+    unpack.add_argument("--state", default="game_state.jsonl")
+    unpack.add_argument("--events", default="game_events.jsonl")
+    info = commands.add_parser("info", help="Summarize a telemetry file")
+    info.add_argument("input")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        state = args.state if os.path.exists(args.state) else None
+        events = args.events if os.path.exists(args.events) else None
+        count = jsonl_to_binary(args.output, state, events)
+        print(f"Packed {count} records into {args.output} ({os.path.getsize(args.output)} bytes)")
+    elif args.command == "unpack":
+        binary_to_jsonl(args.input, args.state, args.events)
+        print(f"Wrote {args.state} and {args.events}")
+    else:
+        with TelemetryReader(args.input) as reader:
+            frames = reader.frames
+            print(f"{args.input}: {len(reader)} snapshots, {len(reader.event_frames)} events, "
+                  f"{len(reader.strings)} interned strings")
+            if len(frames):
+                print(f"Snapshot frames {frames[0]}..{frames[-1]}")
+
+
+if __name__ == "__main__":
+    main()
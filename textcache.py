@@ -0,0 +1,48 @@
+from collections import OrderedDict
+from constants import TEXT_CACHE_SIZE
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by font, string and color."""
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color="white", antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+
+class TextLabel:
+    """A text widget that only re-renders when its value changes."""
+
+    def __init__(self, template, color="white"):
+        self.template = template
+        self.color = color
+        self.font = None
+        self.value = None
+        self.surface = None
+
+    def render(self, font, value):
+        if self.surface is None or value != self.value or font is not self.font:
+            self.font = font
+            self.value = value
+            self.surface = font.render(self.template.format(value), True, self.color)
+        return self.surface
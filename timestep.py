@@ -0,0 +1,36 @@
+from constants import SIMULATION_TICK_RATE, MAX_STEPS_PER_FRAME
+
+
+class FixedTimestep:
+    """Accumulator that turns variable frame times into fixed simulation steps.
+
+    Each rendered frame calls `advance(frame_dt)` and runs that many steps of
+    `step_dt` seconds. What is left over becomes `alpha`, the fraction of a
+    step to interpolate by when drawing. If the simulation cannot keep up,
+    at most `max_steps` run per frame and the backlog is dropped instead of
+    snowballing (the "spiral of death").
+    """
+
+    def __init__(self, tick_rate=SIMULATION_TICK_RATE, max_steps=MAX_STEPS_PER_FRAME):
+        self.step_dt = 1 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped_steps = 0
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, frame_dt):
+        """Add a frame's worth of time and return how many steps to run."""
+        self.accumulator += frame_dt
+        steps = int(self.accumulator / self.step_dt)
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator = self.step_dt * steps
+        self.accumulator -= self.step_dt * steps
+        return steps
+
+    @property
+    def alpha(self):
+        return min(1.0, self.accumulator / self.step_dt)
@@ -0,0 +1,123 @@
+import math
+import time
+from collections import Counter
+import pygame
+from constants import SOUND_VOICES, SOUND_PRIORITIES, SOUND_MIN_INTERVALS, SOUND_BASE_VOLUME
+
+_STAT_KEYS = ("requests", "plays", "coalesced", "rate_limited", "stolen")
+
+
+class VoiceManager:
+    """Plays effects through a fixed set of mixer channels, at most once per frame each.
+
+    `request(name)` only counts the request; `flush()`, called once per
+    frame, turns every requested effect into a single play. N duplicate
+    requests become one play at SOUND_BASE_VOLUME * sqrt(N) (capped at
+    full volume), roughly how loud N overlapping copies would sound.
+
+    Each effect owns SOUND_VOICES[name] channels. When they are all busy a
+    higher-priority effect may take a channel of a lower-priority one, never
+    the other way round; if every usable channel is busy, the longest
+    playing sound of the lowest priority is cut off. An effect that played
+    less than its minimum interval ago is skipped. However many entities
+    collide, the mixer never plays more than one new voice per effect per
+    frame, on a bounded number of channels.
+    """
+
+    def __init__(self, sounds, voices=SOUND_VOICES, priorities=SOUND_PRIORITIES,
+                 intervals=SOUND_MIN_INTERVALS, base_volume=SOUND_BASE_VOLUME):
+        self.sounds = sounds
+        self.priorities = {name: priorities.get(name, 0) for name in sounds}
+        self.intervals = intervals
+        self.base_volume = base_volume
+        self.min_interval = 0.0  # Floor under every interval; raised by the quality governor
+        self.pending = Counter()
+        self.last_played = {}
+        self.started = {}  # Channel index -> when its current sound started
+
+        # Highest priority first, each effect's channels contiguous
+        names = sorted(sounds, key=lambda name: -self.priorities[name])
+        self.order = names
+        total = sum(voices.get(name, 1) for name in names)
+        pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)  # Keep plain Sound.play() off our channels
+        self.channels = [pygame.mixer.Channel(index) for index in range(total)]
+        self.owners = []
+        self.candidates = {}
+        for name in names:
+            self.owners.extend([name] * voices.get(name, 1))
+        for name in names:
+            own = [i for i, owner in enumerate(self.owners) if owner == name]
+            lower = [i for i, owner in enumerate(self.owners) if self.priorities[owner] < self.priorities[name]]
+            self.candidates[name] = own + lower
+
+        self.stats = {name: dict.fromkeys(_STAT_KEYS, 0) for name in names}
+        self.frames = 0
+        self.busy_total = 0
+        self.peak_busy = 0
+
+    def request(self, name):
+        self.pending[name] += 1
+
+    def flush(self, now=None):
+        """Play this frame's requests; call once per frame."""
+        self.frames += 1
+        if self.pending:
+            now = time.perf_counter() if now is None else now
+            for name in self.order:
+                count = self.pending.get(name)
+                if count:
+                    self._play(name, count, now)
+            self.pending.clear()
+
+        busy = sum(1 for channel in self.channels if channel.get_busy())
+        self.busy_total += busy
+        self.peak_busy = max(self.peak_busy, busy)
+
+    def _play(self, name, count, now):
+        stats = self.stats[name]
+        stats["requests"] += count
+        stats["coalesced"] += count - 1
+        interval = max(self.intervals.get(name, 0.0), self.min_interval)
+        last = self.last_played.get(name)
+        if last is not None and now - last < interval:
+            stats["rate_limited"] += 1
+            return
+
+        index = self._pick_channel(name)
+        channel = self.channels[index]
+        if channel.get_busy():
+            stats["stolen"] += 1
+        channel.play(self.sounds[name])
+        channel.set_volume(min(1.0, self.base_volume * math.sqrt(count)))
+        self.started[index] = now
+        self.last_played[name] = now
+        stats["plays"] += 1
+
+    def _pick_channel(self, name):
+        candidates = self.candidates[name]
+        for index in candidates:
+            if not self.channels[index].get_busy():
+                return index
+        owners = self.owners
+        priorities = self.priorities
+        started = self.started
+        return min(candidates, key=lambda index: (priorities[owners[index]], started.get(index, 0.0)))
+
+    def summary(self):
+        """Usage counters per effect plus channel occupancy."""
+        return {
+            "channels": len(self.channels),
+            "peak_busy": self.peak_busy,
+            "mean_busy": self.busy_total / self.frames if self.frames else 0.0,
+            "frames": self.frames,
+            "effects": {name: dict(stats) for name, stats in self.stats.items()},
+        }
+
+    def report(self):
+        summary = self.summary()
+        lines = [f"Voices: {summary['peak_busy']}/{summary['channels']} channels at peak, "
+                 f"{summary['mean_busy']:.2f} busy on average"]
+        for name, stats in summary["effects"].items():
+            lines.append(f"  {name:<11} " + "  ".join(f"{key} {stats[key]}" for key in _STAT_KEYS))
+        return "\n".join(lines)
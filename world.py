@@ -0,0 +1,354 @@
+import hashlib
+import math
+import struct
+import numpy as np
+import pygame
+from constants import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, ASTEROID_SCORE, PARTICLE_COUNT,
+    PLAYER_STARTING_LIVES, WAVE_DELAY_SECONDS, SHOT_MAX_LIVE
+)
+from logger import log_event
+from player import Player
+from asteroid import Asteroid
+from asteroidfield import AsteroidField
+from asteroidshapes import AsteroidShape
+from shot import Shot
+from particle import ParticleSystem
+from spatialhash import SpatialHash
+from entitystore import EntityStore
+from pool import ObjectPool
+from profiler import Profiler
+from randomness import RandomService, random_service
+
+
+class World:
+    """One game session: every sprite group plus score, lives and waves.
+
+    The world never touches the display or the keyboard, so it can be
+    stepped as fast as the CPU allows with `step(dt, inputs)`, where
+    `inputs` is a bitmask built from the flags in controls.py.
+
+    Several worlds can share one EntityStore (`entities`) and be stepped
+    together with `step_worlds`; each then needs its own `index`. Pass
+    `particles=False` to skip explosion effects when nothing is drawn.
+    """
+
+    def __init__(self, sounds=None, profiler=None, entities=None, index=0, particles=True):
+        self.sounds = sounds
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.index = index
+        self.use_particles = particles
+
+        # Sprite groups
+        self.updatable = pygame.sprite.Group()
+        self.drawable = pygame.sprite.Group()
+        self.asteroids = pygame.sprite.Group()
+        self.shots = pygame.sprite.Group()
+
+        # Asteroid and shot kinematics, integrated in one batch per step.
+        # Rows are tagged index * 2 for asteroids and index * 2 + 1 for shots
+        self.shares_entities = entities is not None
+        self.entities = entities if entities is not None else EntityStore()
+
+        # Recycled sprites; shots are capped at SHOT_MAX_LIVE
+        self.asteroid_pool = ObjectPool(Asteroid)
+        self.shot_pool = ObjectPool(Shot, SHOT_MAX_LIVE)
+
+        # Collision broad-phase for shots, rebuilt every step
+        self.shot_grid = SpatialHash()
+
+        # This world's random streams; `bind` makes them the shared ones
+        self.random = RandomService()
+
+        # Cosmetic detail, lowered by the quality governor; `bind` applies it
+        self.explosion_count = PARTICLE_COUNT
+        self.simplified_outlines = False
+
+        self.score = 0
+        self.lives = PLAYER_STARTING_LIVES
+        self.wave = 1
+        self.wave_delay_timer = 0.0
+        self.announced_wave = None
+        self.game_over = False
+        self.seed = None
+        self.player = None
+        self.asteroidfield = None
+        self.particles = None
+
+    def bind(self):
+        """Point the sprite classes at this world's groups."""
+        Player.containers = [self.updatable, self.drawable]
+        Asteroid.containers = [self.asteroids, self.drawable]
+        AsteroidField.containers = [self.updatable]
+        Shot.containers = [self.shots, self.drawable]
+        Asteroid.store = self.entities
+        Shot.store = self.entities
+        Asteroid.store_tag = self.index * 2
+        Shot.store_tag = self.index * 2 + 1
+        Asteroid.pool = self.asteroid_pool
+        Shot.pool = self.shot_pool
+        ParticleSystem.containers = [self.updatable, self.drawable]
+        ParticleSystem.explosion_count = self.explosion_count
+        AsteroidShape.simplified = self.simplified_outlines
+        random_service.use(self.random)
+
+    def clear(self):
+        """Remove all game objects."""
+        for sprite in self.updatable:
+            sprite.kill()
+        for sprite in self.drawable:
+            sprite.kill()
+        for sprite in self.asteroids:
+            sprite.kill()
+        for sprite in self.shots:
+            sprite.kill()
+        # Killing released every row this world owned; a shared store still
+        # holds the other worlds' rows
+        if not self.shares_entities:
+            self.entities.clear()
+        # Nothing holds the killed sprites any more, so the next game's
+        # first wave can reuse them right away
+        self.asteroid_pool.collect()
+        self.shot_pool.collect()
+
+    def reset(self, seed=None):
+        """Clear the world and start a fresh game at wave 1.
+
+        Every game reseeds this world's random streams; pass `seed` to repeat
+        a game exactly, or leave it None to draw a new one (kept in `seed`).
+        """
+        self.seed = self.random.seed(seed)
+        self.bind()
+        self.clear()
+        self.score = 0
+        self.lives = PLAYER_STARTING_LIVES
+        self.wave = 1
+        self.wave_delay_timer = 0.0
+        self.announced_wave = None
+        self.game_over = False
+        self.player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+        self.asteroidfield = AsteroidField()
+        self.particles = ParticleSystem() if self.use_particles else None
+        self.asteroidfield.spawn_wave(self.wave)
+
+    def step(self, dt, inputs=0):
+        """Advance the simulation by `dt` seconds with the given inputs."""
+        self.update(dt, inputs)
+        if not self.game_over:
+            self.resolve_collisions()
+            self.advance_waves(dt)
+
+    def update(self, dt, inputs=0):
+        with self.profiler.phase("update"):
+            self._update(dt, inputs)
+
+    def _update(self, dt, inputs):
+        self.bind()
+        self.entities.save_previous()
+        self.player.save_previous()
+        self.player.inputs = inputs
+        # Sprites killed during the previous step are safe to reuse now
+        self.asteroid_pool.collect()
+        self.shot_pool.collect()
+        for expired in self.entities.update(dt):
+            expired.kill()
+        self.updatable.update(dt)
+
+    def resolve_collisions(self):
+        with self.profiler.phase("collision"):
+            self._resolve_collisions()
+
+    def _play(self, name):
+        if self.sounds:
+            with self.profiler.phase("sound"):
+                self.sounds.play(name)
+
+    def _resolve_collisions(self):
+        player = self.player
+        shots = self.shots
+        asteroids = self.asteroids.sprites()
+        shot_grid = self.shot_grid
+        shot_grid.build(shots, *self.entities.gather(shots))
+        store = self.entities
+        slots = [asteroid.slot for asteroid in asteroids]
+        asteroid_centers = store.positions[slots]
+        asteroid_sizes = store.radii[slots]
+        asteroid_positions = asteroid_centers.tolist()
+        asteroid_radii = asteroid_sizes.tolist()
+        # The player only moves on respawn, so test it against every asteroid up front
+        player_hits = player.collides_with_circles(asteroid_centers, asteroid_sizes)
+
+        shot_positions = shot_grid.positions
+        shot_radii = shot_grid.radii
+        shot_objects = shot_grid.objects
+        for i, (asteroid, (x, y), radius) in enumerate(zip(asteroids, asteroid_positions, asteroid_radii)):
+            for index in shot_grid.query_indices(x, y, radius):
+                shot = shot_objects[index]
+                shot_x, shot_y = shot_positions[index]
+                dx = x - shot_x
+                dy = y - shot_y
+                if math.sqrt(dx * dx + dy * dy) <= radius + shot_radii[index] and shots.has(shot):
+                    log_event("asteroid_shot")
+                    self.score += ASTEROID_SCORE.get(asteroid.radius, 10)
+                    if self.particles is not None:
+                        self.particles.spawn_explosion(x, y)
+                    self._play("explosion")
+                    asteroid.split()
+                    shot.kill()
+                    break
+            if player_hits[i] and not player.is_invulnerable():
+                log_event("player_hit")
+                if self.particles is not None:
+                    self.particles.spawn_explosion(player.position.x, player.position.y)
+                self._play("player_hit")
+                self.lives -= 1
+                if self.lives <= 0:
+                    self.game_over = True
+                    break
+                player.respawn(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+                player_hits = player.collides_with_circles(asteroid_centers, asteroid_sizes)
+
+    def advance_waves(self, dt):
+        """Start the next wave once the field is clear and the delay ran out."""
+        self.announced_wave = None
+        if len(self.asteroids) != 0 or self.asteroidfield.spawning:
+            return
+        if self.wave_delay_timer <= 0:
+            self.wave_delay_timer = WAVE_DELAY_SECONDS
+            self.asteroidfield.prepare_wave(self.wave + 1)
+        else:
+            self.wave_delay_timer -= dt
+            self.announced_wave = self.wave + 1
+            if self.wave_delay_timer <= 0:
+                self.wave += 1
+                self.asteroidfield.spawn_wave(self.wave)
+
+    def state_hash(self):
+        """Short digest of everything that affects future steps.
+
+        Two worlds with the same hash after the same step will keep
+        evolving identically given the same inputs; replays compare these.
+        """
+        digest = hashlib.blake2b(digest_size=8)
+        player = self.player
+        digest.update(struct.pack(
+            "<3i?8d", self.score, self.lives, self.wave, self.game_over, self.wave_delay_timer,
+            player.position.x, player.position.y, player.velocity.x, player.velocity.y,
+            player.rotation, player.shot_cooldown, player.invulnerable_timer,
+        ))
+        store = self.entities
+        slots = store.live_slots()
+        if self.shares_entities:
+            slots = slots[store.tags[slots] >> 1 == self.index]
+        for name in ("positions", "velocities", "rotations", "rotation_speeds", "radii", "lifetimes"):
+            digest.update(getattr(store, name)[slots].tobytes())
+        return digest.digest()
+
+    def pool_stats(self):
+        return {
+            "asteroids": self.asteroid_pool.stats(),
+            "shots": self.shot_pool.stats(),
+            "particles": self.particles.stats() if self.particles else None,
+        }
+
+    def draw(self, screen, alpha=1.0):
+        """Draw every sprite and return the screen rects that were touched.
+
+        `alpha` blends between the previous and current step (0..1).
+        """
+        self.bind()
+        self.entities.interpolate(alpha)
+        rects = []
+        for sprite in self.drawable:
+            drawn = sprite.draw(screen, alpha)
+            if drawn is None:
+                continue
+            if isinstance(drawn, pygame.Rect):
+                rects.append(drawn)
+            else:
+                rects.extend(drawn)
+        return rects
+
+
+def step_worlds(worlds, dt, inputs):
+    """Step several worlds that share one EntityStore, as one batch.
+
+    `inputs` holds one bitmask per world. Every world ends up exactly where
+    its own `step` would have taken it: the shared store is integrated once
+    for all of them, and the collision rules only run for worlds where a
+    shot or the player's bounding circle touches an asteroid.
+    """
+    store = worlds[0].entities
+    for world, world_inputs in zip(worlds, inputs):
+        world.player.save_previous()
+        world.player.inputs = world_inputs
+        world.asteroid_pool.collect()
+        world.shot_pool.collect()
+    store.save_previous()
+    for expired in store.update(dt):
+        expired.kill()
+    for world in worlds:
+        world.bind()
+        world.updatable.update(dt)
+
+    playing = [world for world in worlds if not world.game_over]
+    touching = _touching_asteroids(playing, store)
+    for world in playing:
+        # Only collisions and a cleared field create sprites or draw random
+        # numbers here, so most worlds skip rebinding
+        if touching[world.index] or not world.asteroids:
+            world.bind()
+        if touching[world.index]:
+            world._resolve_collisions()
+        world.advance_waves(dt)
+
+
+def _touching_asteroids(worlds, store):
+    """Per world index: does any shot or player come near an asteroid?
+
+    A cheap superset of the hits `World._resolve_collisions` can find.
+    """
+    slots = store.live_slots()
+    tags = store.tags[slots]
+    owners = tags >> 1
+    # Finished worlds may still own rows, so size by both
+    size = max(max((world.index for world in worlds), default=-1),
+               owners.max(initial=-1)) + 1
+    touching = np.zeros(size, dtype=bool)
+    is_shot = (tags & 1).astype(bool)
+    positions = store.positions[slots]
+    radii = store.radii[slots] + 1e-6  # Absorb rounding against the exact tests
+    asteroid_owners = owners[~is_shot]
+    asteroid_positions = positions[~is_shot]
+    asteroid_radii = radii[~is_shot]
+
+    # Players of worlds not being stepped sit at infinity and touch nothing
+    players = np.full((size, 3), np.inf)
+    for world in worlds:
+        player = world.player
+        players[world.index] = (player.position.x, player.position.y, player.bounding_radius())
+    near = players[asteroid_owners]
+    offsets = asteroid_positions - near[:, :2]
+    reach = asteroid_radii + near[:, 2]
+    touching[asteroid_owners[np.einsum("ij,ij->i", offsets, offsets) <= reach * reach]] = True
+
+    # Every asteroid against every shot of its own world
+    shot_owners = owners[is_shot]
+    order = np.argsort(shot_owners, kind="stable")
+    shot_positions = positions[is_shot][order]
+    shot_radii = radii[is_shot][order]
+    shot_counts = np.bincount(shot_owners, minlength=size)
+    shot_starts = np.cumsum(shot_counts) - shot_counts
+    counts = shot_counts[asteroid_owners]
+    total = counts.sum()
+    if total == 0:
+        return touching
+    pairs = np.repeat(np.arange(len(asteroid_owners)), counts)
+    # Position of each pair within its asteroid's run of shots
+    ranks = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    shots = shot_starts[asteroid_owners[pairs]] + ranks
+    offsets = asteroid_positions[pairs] - shot_positions[shots]
+    reach = asteroid_radii[pairs] + shot_radii[shots]
+    hits = pairs[np.einsum("ij,ij->i", offsets, offsets) <= reach * reach]
+    touching[asteroid_owners[hits]] = True
+    return touching